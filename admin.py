@@ -2,11 +2,12 @@ import streamlit as st
 import time
 from auth import AuthenticationManager
 from exceptions import AdminError
-from constants import DATA_FILE
 
 class AdminPanel:
-    def __init__(self, df):
+    def __init__(self, df, beat_index, data_loader):
         self.df = df
+        self.beat_index = beat_index
+        self.data_loader = data_loader
         self.auth_manager = AuthenticationManager()
         self.reset_user_management_state()
 
@@ -28,7 +29,7 @@ class AdminPanel:
         SELECTED_BEAT_KEY = "beat_renaming_selected_beat"
 
         with st.expander("✏️ Rename Beat", expanded=False):
-            all_beats = sorted(self.df["full_beat"].unique()) if "full_beat" in self.df.columns else []
+            all_beats = self.beat_index.beats
 
             if not all_beats:
                 st.info("No beats available for renaming")
@@ -61,9 +62,9 @@ class AdminPanel:
                     st.error("A beat with this name already exists. Please choose a different name.")
                 else:
                     try:
-                        self.df.loc[self.df['full_beat'] == beat_to_rename, 'full_beat'] = new_beat_name
-                        self.df.to_csv(DATA_FILE, index=False)
-                        st.cache_data.clear()
+                        # Recorded in the beat alias table; loaded outlets and cached
+                        # routes stay valid because no coordinates changed.
+                        self.data_loader.rename_beat(beat_to_rename, new_beat_name)
 
                         st.toast(f"Successfully renamed '{beat_to_rename}' to '{new_beat_name}'", icon="✅")
                         time.sleep(2)
@@ -148,7 +149,7 @@ class AdminPanel:
 
                     if selected_user:
                         user_mobile = selected_user.split(" - ")[0]
-                        all_beats = sorted(self.df["full_beat"].unique()) if "full_beat" in self.df.columns else []
+                        all_beats = self.beat_index.beats
 
                         current_assigned = authorized_users[user_mobile]["assigned_beats"]
                         valid_assigned = [beat for beat in current_assigned if beat in all_beats]
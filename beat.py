@@ -1,19 +1,22 @@
 import streamlit as st
 import pandas as pd
 import traceback
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 from auth import AuthenticationManager
 from data_loader import DataLoader
-from route_optimizer import RouteOptimizer
+from streamlit_route_optimizer import StreamlitRouteOptimizer, shared_route_jobs
+from route_cache import RouteCache
 from map_generator import MapGenerator
+from figure_cache import shared_figure_cache
 from ui_components import UIComponents
 from admin import AdminPanel
 import time
 
 auth_manager = AuthenticationManager()
-data_loader = DataLoader()
-route_optimizer = RouteOptimizer()
-map_generator = MapGenerator()
+route_cache = RouteCache()
+data_loader = DataLoader(route_cache=route_cache)
+route_optimizer = StreamlitRouteOptimizer(route_cache=route_cache, route_jobs=shared_route_jobs())
+map_generator = MapGenerator(figure_cache=shared_figure_cache())
 ui_components = UIComponents()
 
 st.set_page_config(
@@ -62,6 +65,7 @@ def main():
         try:
             with st.spinner("Loading outlet data..."):
                 df = data_loader.load_data()
+                beat_index = data_loader.load_beat_index()
         except Exception as e:
             st.error(f"Data loading error: {e}")
             return
@@ -72,7 +76,7 @@ def main():
 
         if is_admin:
             try:
-                admin_panel = AdminPanel(df)
+                admin_panel = AdminPanel(df, beat_index, data_loader)
                 admin_panel.render()
             except Exception as e:
                 st.error(f"Admin panel error: {e}")
@@ -82,7 +86,7 @@ def main():
 
 
         if is_admin:
-            all_beats = sorted(df["full_beat"].unique()) if "full_beat" in df.columns else []
+            all_beats = beat_index.beats
         else:
             all_beats = st.session_state.assigned_beats
 
@@ -95,9 +99,9 @@ def main():
         )
 
         if selected_beat == "All Beats" and all_beats:
-            df_display = df[df["full_beat"].isin(all_beats)] if not is_admin else df
+            df_display = beat_index.select(df, all_beats) if not is_admin else df
         elif selected_beat != "All Beats":
-            df_display = df[df["full_beat"] == selected_beat]
+            df_display = beat_index.select(df, selected_beat)
         else:
             df_display = pd.DataFrame()
 
@@ -106,9 +110,12 @@ def main():
             st.markdown("### 🗺️ Outlet Locations by Beat")
             try:
                 with st.spinner("Generating map visualization..."):
-                    fig = map_generator.create_plotly_map(df_display, marker_size=9)
+                    view_key = (selected_beat, None if is_admin else all_beats, data_loader.display_version())
+                    fig = map_generator.plotly_map(df_display, view_key, marker_size=9)
                     if fig:
                         st.plotly_chart(fig, use_container_width=True)
+                        if selected_beat == "All Beats":
+                            st.caption("Outlets are grouped into clusters per beat. Select a beat to see individual outlets.")
                     else:
                         st.warning("No valid location data to display.")
             except Exception as e:
@@ -117,28 +124,33 @@ def main():
         # ADMIN VIEW: Full route optimization features
         if is_admin and not df_display.empty and selected_beat != "All Beats":
             st.markdown("### 🚗 Route Optimization")
-            beat_df = df_display.copy()
+            beat_df = df_display
             coords = beat_df[["lat", "longi"]].values
             
             if len(coords) > 0:
                 try:
-                    with st.spinner(f"Optimizing route for {selected_beat}..."):
-                        route_order = route_optimizer.optimize_single_beat(coords)
-                        sorted_df = beat_df.iloc[route_order].copy()
-                        sorted_df.reset_index(drop=True, inplace=True)
+                    job = route_optimizer.optimize_in_background(coords, beat=selected_beat)
+                    if not job.done:
+                        ui_components.route_pending(selected_beat, job, beat_df)
+                    else:
+                        route_result = job.get()
+                        sorted_df = beat_df.take(route_result.route).reset_index(drop=True)
                         sorted_df["sequence"] = sorted_df.index + 1
                         sorted_df["gmaps_link"] = "https://www.google.com/maps/search/?api=1&query=" + \
                                                 sorted_df["lat"].astype(str) + "," + \
                                                 sorted_df["longi"].astype(str)
                         
-                        total_distance = route_optimizer.calculate_route_distance(sorted_df)
+                        legs, cumulative = route_optimizer.route_leg_distances(sorted_df)
+                        sorted_df["leg_distance_km"] = legs.round(3)
+                        sorted_df["cumulative_distance_km"] = cumulative.round(3)
+                        total_distance = float(cumulative[-1])
                         sorted_df["total_distance"] = total_distance
                         
                         st.markdown(f"<div class='beat-header'><h3>Beat Details: {selected_beat}</h3></div>", unsafe_allow_html=True)
                         
                         st.markdown("### 💾 Download Beat Details")
                         try:
-                            download_df = sorted_df.copy()
+                            download_df = sorted_df
                             if "geometry" in download_df.columns:
                                 download_df = download_df.drop(columns=["geometry"])
                             
@@ -153,20 +165,21 @@ def main():
                         except Exception as e:
                             st.error(f"CSV export error: {e}")
                         
-                        st.info(f"**Total Minimum Route Distance:** {total_distance:.2f} km")
+                        ui_components.route_distance(total_distance, route_result, "Total Minimum Route Distance")
+                        ui_components.optimization_summary(route_result)
                         
                         col1, col2 = st.columns([1, 1])
                         
                         with col1:
                             st.markdown("#### Outlet Details")
-                            for i, row in sorted_df.iterrows():
-                                ui_components.outlet_info_card(row)
+                            ui_components.visit_plan(sorted_df, key="outlet_details")
                         
                         with col2:
                             st.markdown("#### 📍 Optimized Route Map")
                             try:
-                                folium_map = map_generator.create_folium_map(sorted_df)
-                                st_folium(folium_map, width=600, height=500, returned_objects=[])
+                                route_map_html = map_generator.folium_map_html(
+                                    sorted_df, (selected_beat, data_loader.display_version()))
+                                components.html(route_map_html, width=600, height=500)
                             except Exception as e:
                                 st.error(f"Route map error: {e}")
                 except Exception as e:
@@ -178,41 +191,47 @@ def main():
         elif not is_admin and not df_display.empty and selected_beat != "All Beats":
             st.markdown(f"<div class='beat-header'><h3>Beat: {selected_beat}</h3></div>", unsafe_allow_html=True)
             
-            beat_df = df_display.copy()
+            beat_df = df_display
             coords = beat_df[["lat", "longi"]].values
             
             if len(coords) > 0:
                 try:
-                    with st.spinner(f"Optimizing visit order for {selected_beat}..."):
-                        route_order = route_optimizer.optimize_single_beat(coords)
-                        sorted_df = beat_df.iloc[route_order].copy()
-                        sorted_df.reset_index(drop=True, inplace=True)
+                    job = route_optimizer.optimize_in_background(coords, beat=selected_beat)
+                    if not job.done:
+                        ui_components.route_pending(selected_beat, job, beat_df)
+                    else:
+                        route_result = job.get()
+                        sorted_df = beat_df.take(route_result.route).reset_index(drop=True)
                         sorted_df["sequence"] = sorted_df.index + 1
                         sorted_df["gmaps_link"] = "https://www.google.com/maps/search/?api=1&query=" + \
                                                 sorted_df["lat"].astype(str) + "," + \
                                                 sorted_df["longi"].astype(str)
                         
-                        total_distance = route_optimizer.calculate_route_distance(sorted_df)
+                        legs, cumulative = route_optimizer.route_leg_distances(sorted_df)
+                        sorted_df["leg_distance_km"] = legs.round(3)
+                        sorted_df["cumulative_distance_km"] = cumulative.round(3)
+                        total_distance = float(cumulative[-1])
                         
-                        st.info(f"**Total Minimum Route Distance:** {total_distance:.2f} km")
+                        ui_components.route_distance(total_distance, route_result, "Total Minimum Route Distance")
+                        ui_components.optimization_summary(route_result)
                         st.info(f"**Number of Outlets:** {len(sorted_df)}")
                         
                         # Show optimized sequence in the same style as admin
                         st.markdown("#### Outlet Visit Plan")
-                        for i, row in sorted_df.iterrows():
-                            ui_components.outlet_info_card(row)
+                        ui_components.visit_plan(sorted_df, key="visit_plan")
                         
                         # Download button for user
                         st.markdown("### 💾 Download Visit Plan")
                         try:
-                            download_df = sorted_df.copy()
+                            download_df = sorted_df
                             if "geometry" in download_df.columns:
                                 download_df = download_df.drop(columns=["geometry"])
                             
                             # Keep only essential columns for users
                             user_columns = [
                                 "sequence", "outlet_name", "type_name", "owner_name", 
-                                "contact_no", "street_address", "landmark", "gmaps_link"
+                                "contact_no", "street_address", "landmark", "gmaps_link",
+                                "leg_distance_km", "cumulative_distance_km"
                             ]
                             download_df = download_df[user_columns]
                             
@@ -237,5 +256,7 @@ def main():
         st.error(f"Unexpected application error: {e}")
         st.error(traceback.format_exc())
 
+    route_optimizer.poll_pending()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import json
+import os
+from exceptions import DataError
+from constants import BEAT_ALIAS_FILE
+
+
+class BeatAliases:
+    def __init__(self, path=BEAT_ALIAS_FILE):
+        self.path = path
+        self._version = None
+        self._aliases = {}
+
+    def version(self):
+        try:
+            stat = os.stat(self.path)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except FileNotFoundError:
+            return "0"
+
+    def load(self):
+        # Maps the beat name in the source data to its current display name.
+        version = self.version()
+        if version != self._version:
+            try:
+                if version == "0":
+                    aliases = {}
+                else:
+                    with open(self.path, "r") as f:
+                        aliases = json.load(f)
+            except (OSError, ValueError) as e:
+                raise DataError(f"Beat alias table read failed: {e}")
+            self._version, self._aliases = version, aliases
+        return dict(self._aliases)
+
+    def current_name(self, source_name):
+        return self.load().get(source_name, source_name)
+
+    def rename(self, old_name, new_name):
+        aliases = self.load()
+        sources = [src for src, name in aliases.items() if name == old_name]
+        if not sources:
+            sources = [old_name]
+        for src in sources:
+            if src == new_name:
+                aliases.pop(src, None)
+            else:
+                aliases[src] = new_name
+        self._write(aliases)
+        return aliases
+
+    def _write(self, aliases):
+        # Every session re-reads the table when its mtime changes, so it must
+        # never find half a JSON document; the rename only lands once complete.
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(aliases, f, indent=4, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            raise DataError(f"Beat alias table write failed: {e}")
+
+    def apply(self, df, column="full_beat"):
+        aliases = self.load()
+        if not aliases or column not in df.columns:
+            return df
+        beats = df[column]
+        categories = set(beats.cat.categories)
+        mapping = {src: name for src, name in aliases.items() if src in categories}
+        # A newer export may already use an alias as a real beat name; that beat keeps its own name.
+        mapping = {src: name for src, name in mapping.items()
+                   if name not in categories or name in mapping}
+        if mapping:
+            # Relabels the categories on a shallow copy: the input frame is shared
+            # and every other column (and the row codes) is reused as is.
+            df = df.copy(deep=False)
+            df[column] = beats.cat.rename_categories(mapping)
+        return df
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+class BeatIndex:
+    def __init__(self, df, column="full_beat"):
+        beats = pd.Categorical(df[column] if column in df.columns else [])
+        codes = np.asarray(beats.codes)
+        categories = beats.categories
+
+        # One stable sort groups each beat's rows while keeping their original order,
+        # so a beat's slice matches what a boolean filter on the frame would return.
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+        self.positions = {
+            categories[k]: order[bounds[k]:bounds[k + 1]]
+            for k in range(len(categories))
+            if bounds[k + 1] > bounds[k]
+        }
+        self.beats = sorted(self.positions)
+        self.stats = self._beat_stats(df)
+
+    def _beat_stats(self, df):
+        columns = ["count", "min_lat", "max_lat", "min_lon", "max_lon", "centroid_lat", "centroid_lon"]
+        if not self.beats:
+            return pd.DataFrame(columns=columns)
+        lat = df["lat"].to_numpy(dtype=np.float64)
+        lon = df["longi"].to_numpy(dtype=np.float64)
+        rows = []
+        for beat in self.beats:
+            rows_lat, rows_lon = lat[self.positions[beat]], lon[self.positions[beat]]
+            rows.append((len(rows_lat), rows_lat.min(), rows_lat.max(), rows_lon.min(), rows_lon.max(),
+                         rows_lat.mean(), rows_lon.mean()))
+        return pd.DataFrame(rows, index=pd.Index(self.beats, name="full_beat"), columns=columns)
+
+    def renamed(self, mapping):
+        # Rename only relabels the affected entries; row positions and stats are shared.
+        mapping = {old: new for old, new in mapping.items() if old in self.positions and old != new}
+        mapping = {old: new for old, new in mapping.items() if new not in self.positions or new in mapping}
+        if not mapping:
+            return self
+        index = object.__new__(BeatIndex)
+        index.positions = {mapping.get(beat, beat): rows for beat, rows in self.positions.items()}
+        index.beats = sorted(index.positions)
+        index.stats = self.stats.rename(index=mapping).sort_index()
+        return index
+
+    def __contains__(self, beat):
+        return beat in self.positions
+
+    def __len__(self):
+        return len(self.beats)
+
+    def rows_for(self, beats):
+        found = [self.positions[b] for b in beats if b in self.positions]
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(found))
+
+    def select(self, df, beats):
+        if isinstance(beats, str):
+            beats = [beats]
+        return df.take(self.rows_for(beats))
+
+    def count(self, beat):
+        return len(self.positions.get(beat, ()))
+
+    def bbox(self, beat):
+        s = self.stats.loc[beat]
+        return (float(s["min_lat"]), float(s["min_lon"])), (float(s["max_lat"]), float(s["max_lon"]))
+
+    def centroid(self, beat):
+        s = self.stats.loc[beat]
+        return float(s["centroid_lat"]), float(s["centroid_lon"])
@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from genetic import Population, ga_parameters  # noqa: E402
+from geo import distance_matrix_km  # noqa: E402
+from local_search import TwoOptEngine  # noqa: E402
+
+
+def legacy_route_distance(route, dist_matrix):
+    total = 0.0
+    for i in range(len(route) - 1):
+        total += dist_matrix[route[i], route[i + 1]]
+    return total
+
+
+def legacy_generation(population, dist_matrix, two_opt, mutation_rate):
+    # One generation of the list-of-arrays GA that optimize_single_beat used to run.
+    n = len(dist_matrix)
+    population = sorted(population, key=lambda x: legacy_route_distance(x, dist_matrix))
+    next_gen = population[:10]
+    while len(next_gen) < len(population):
+        p1, p2 = random.choices(population[:50], k=2)
+        a, b = sorted(random.sample(range(n), 2))
+        child = np.concatenate([p2[~np.isin(p2, p1[a:b])], p1[a:b]])
+        if random.random() < mutation_rate:
+            i, j = random.sample(range(n), 2)
+            child[i], child[j] = child[j], child[i]
+        next_gen.append(two_opt.improve(child))
+    return next_gen
+
+
+def measure(step, generations):
+    tracemalloc.start()
+    start = time.perf_counter()
+    allocated = 0
+    for _ in range(generations):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return elapsed / generations, allocated / generations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-generation time and memory of the GA population")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'n':>5} {'variant':<8} {'ms/gen':>9} {'peak KiB/gen':>13}")
+    for n in args.sizes:
+        rng = np.random.default_rng(args.seed)
+        random.seed(args.seed)
+        coords = np.c_[14.0 + rng.random(n) * 0.3, 76.0 + rng.random(n) * 0.3]
+        dist = distance_matrix_km(coords)
+        size, _, mutation_rate = ga_parameters(n)
+        two_opt = TwoOptEngine(dist)
+
+        population = Population.random(n, size, two_opt, rng, dist)
+        legacy = [route.copy() for route in population.routes]
+        population.next_generation(two_opt, rng, mutation_rate)  # warm-up / JIT compile
+
+        def legacy_step():
+            nonlocal legacy
+            legacy = legacy_generation(legacy, dist, two_opt, mutation_rate)
+
+        for name, step in (("legacy", legacy_step),
+                           ("array", lambda: population.next_generation(two_opt, rng, mutation_rate))):
+            per_gen, peak = measure(step, args.generations)
+            print(f"{n:>5} {name:<8} {per_gen * 1000:>9.2f} {peak / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
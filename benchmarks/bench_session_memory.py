@@ -0,0 +1,77 @@
+import argparse
+import gc
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader  # noqa: E402
+
+
+def legacy_rerun(shared, beat, route):
+    # What each rerun held before: st.cache_data hands out an unpickled copy of
+    # the whole frame, then the page copies the beat, the route and the download.
+    df = pickle.loads(pickle.dumps(shared))
+    df_display = df[df["full_beat"] == beat]
+    beat_df = df_display.copy()
+    sorted_df = beat_df.iloc[route].copy()
+    sorted_df.reset_index(drop=True, inplace=True)
+    sorted_df["sequence"] = sorted_df.index + 1
+    download_df = sorted_df.copy()
+    return df, df_display, beat_df, sorted_df, download_df
+
+
+def shared_rerun(data_loader, beat, route):
+    df = data_loader.load_data()
+    beat_index = data_loader.load_beat_index()
+    df_display = beat_index.select(df, beat)
+    beat_df = df_display
+    sorted_df = beat_df.take(route).reset_index(drop=True)
+    sorted_df["sequence"] = sorted_df.index + 1
+    download_df = sorted_df
+    return df, df_display, beat_df, sorted_df, download_df
+
+
+def measure(rerun, sessions):
+    # Keeps every session's objects alive, as concurrent sessions do, and
+    # reports the memory added per session on the Python heap and in Arrow's pool.
+    gc.collect()
+    tracemalloc.start()
+    heap_before = tracemalloc.get_traced_memory()[0]
+    arrow_before = pa.total_allocated_bytes()
+    start = time.perf_counter()
+    held = [rerun() for _ in range(sessions)]
+    elapsed = time.perf_counter() - start
+    heap = tracemalloc.get_traced_memory()[0] - heap_before
+    arrow = pa.total_allocated_bytes() - arrow_before
+    tracemalloc.stop()
+    del held
+    return elapsed / sessions, heap / sessions, arrow / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-session memory of the loaded outlet data")
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    data_loader = DataLoader()
+    shared = data_loader.load_data()
+    beat = shared["full_beat"].value_counts().index[0]
+    route = np.random.default_rng(0).permutation(int((shared["full_beat"] == beat).sum()))
+
+    print(f"{len(shared)} outlets, {args.sessions} sessions viewing beat {beat} ({len(route)} outlets)")
+    print(f"{'variant':<8} {'ms/rerun':>9} {'heap KiB/session':>17} {'arrow KiB/session':>18}")
+    for name, rerun in (("legacy", lambda: legacy_rerun(shared, beat, route)),
+                        ("shared", lambda: shared_rerun(data_loader, beat, route))):
+        per_rerun, heap, arrow = measure(rerun, args.sessions)
+        print(f"{name:<8} {per_rerun * 1000:>9.2f} {heap / 1024:>17.1f} {arrow / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.spatial import distance_matrix
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_search import HAS_NUMBA, TwoOptEngine  # noqa: E402
+
+
+def legacy_two_opt(route, dist_matrix):
+    # The fixed 15-position window loop RouteOptimizer used before TwoOptEngine.
+    best = route.copy()
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 2):
+            for j in range(i + 2, min(len(route), i + 15)):
+                a, b, c, d = best[i - 1], best[i], best[j - 1], best[j % len(best)]
+                if dist_matrix[a, c] + dist_matrix[b, d] < dist_matrix[a, b] + dist_matrix[c, d]:
+                    best[i:j] = best[i:j][::-1]
+                    improved = True
+    return best
+
+
+def path_length(route, dist_matrix):
+    return float(dist_matrix[route[:-1], route[1:]].sum())
+
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark 2-opt backends on random beats")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100, 200, 500])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    variants = [("legacy", None, None)]
+    for backend in (["numba"] if HAS_NUMBA else []) + ["numpy", "python"]:
+        for mode in ("full", "neighbors"):
+            variants.append((f"{backend}/{mode}", backend, mode))
+
+    print(f"{'n':>5} {'variant':<18} {'time ms':>10} {'speedup':>8} {'length':>9}")
+    for n in args.sizes:
+        coords = rng.random((n, 2))
+        dist = distance_matrix(coords, coords)
+        start_route = rng.permutation(n)
+        base_time = None
+        for name, backend, mode in variants:
+            if backend == "python" and n > 200:
+                continue
+            if backend is None:
+                fn = lambda: legacy_two_opt(start_route.copy(), dist)
+            else:
+                engine = TwoOptEngine(dist, mode=mode, backend=backend)
+                engine.improve(start_route)  # warm-up / JIT compile
+                fn = lambda: engine.improve(start_route)
+            route, elapsed = time_call(fn, args.repeats)
+            base_time = base_time or elapsed
+            print(f"{n:>5} {name:<18} {elapsed * 1000:>10.2f} {base_time / elapsed:>7.1f}x "
+                  f"{path_length(route, dist):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Synthetic beats are drawn inside the Davangere sales region (~65 km square).
+REGION = ((14.0, 14.6), (75.6, 76.2))
+
+
+def uniform_instance(n, rng):
+    (lat0, lat1), (lon0, lon1) = REGION
+    return np.c_[rng.uniform(lat0, lat1, n), rng.uniform(lon0, lon1, n)]
+
+
+def clustered_instance(n, rng, clusters=None, spread_deg=0.01):
+    # Outlets bunch around market streets: a few town centres with ~1 km spread.
+    clusters = clusters or max(2, n // 25)
+    centres = uniform_instance(clusters, rng)
+    labels = rng.integers(0, clusters, n)
+    return centres[labels] + rng.normal(0.0, spread_deg, (n, 2))
+
+
+def synthetic_instances(sizes, seed=0):
+    rng = np.random.default_rng(seed)
+    instances = []
+    for n in sizes:
+        instances.append((f"uniform-{n}", "uniform", uniform_instance(n, rng)))
+        instances.append((f"clustered-{n}", "clustered", clustered_instance(n, rng)))
+    return instances
+
+
+def csv_beats(count, seed=0, min_outlets=5):
+    from data_loader import DataLoader
+
+    df = DataLoader().load_data()
+    sizes = df.groupby("full_beat", observed=True).size()
+    beats = sorted(sizes[sizes >= min_outlets].index)
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(beats, size=min(count, len(beats)), replace=False)
+    return [(f"beat-{beat}", "csv", df.loc[df["full_beat"] == beat, ["lat", "longi"]].to_numpy())
+            for beat in sorted(picked)]
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import csv_beats, synthetic_instances  # noqa: E402
+from local_search import HAS_NUMBA  # noqa: E402
+from route_optimizer import RouteOptimizer  # noqa: E402
+
+
+def run_solver(coords, solver, args, measure_memory):
+    optimizer = RouteOptimizer(workers=args.workers, seed=args.seed)
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = optimizer.solve(coords, solver=solver, time_limit=args.time_limit)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def load_best_known(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {(r["instance"], r["solver"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nComparison with {baseline_path} (tolerance {tolerance:.0%}):")
+    for r in results:
+        old = baseline.get((r["instance"], r["solver"]))
+        if old is None:
+            continue
+        time_ratio = r["wall_time_s"] / old["wall_time_s"] if old["wall_time_s"] else 1.0
+        length_ratio = r["length_km"] / old["length_km"] if old["length_km"] else 1.0
+        flags = []
+        if length_ratio > 1 + tolerance:
+            flags.append("LONGER")
+        if time_ratio > 1 + tolerance and r["wall_time_s"] - old["wall_time_s"] > 0.05:
+            flags.append("SLOWER")
+        regressions += bool(flags)
+        if flags:
+            print(f"  {r['instance']:<16} {r['solver']:<11} time x{time_ratio:.2f} "
+                  f"length x{length_ratio:.3f}  {' '.join(flags)}")
+    print(f"  {regressions} regression(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every RouteOptimizer solver")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 200, 500, 1000])
+    parser.add_argument("--csv-beats", type=int, default=3, help="beats sampled from the outlet export")
+    parser.add_argument("--solvers", nargs="+", default=sorted(RouteOptimizer.SOLVERS),
+                        choices=sorted(RouteOptimizer.SOLVERS))
+    parser.add_argument("--time-limit", type=float, default=2.0, help="per-solver budget in seconds")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-memory", action="store_true",
+                        help="skip the separate tracemalloc pass for peak memory")
+    parser.add_argument("--best-known", default=os.path.join(os.path.dirname(__file__), "best_known.json"),
+                        help="JSON of best tour lengths; only read unless --update-best-known")
+    parser.add_argument("--update-best-known", action="store_true",
+                        help="write shorter tours found by this run back to --best-known")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+
+    instances = synthetic_instances(args.sizes, args.seed)
+    if args.csv_beats:
+        instances = csv_beats(args.csv_beats, args.seed) + instances
+
+    # Load numba kernels (and any JIT compilation) before anything is timed.
+    warmup = synthetic_instances([12], args.seed)[0][2]
+    for solver in args.solvers:
+        RouteOptimizer(seed=args.seed).solve(warmup, solver=solver, time_limit=0.1)
+
+    best_known = load_best_known(args.best_known)
+    results = []
+    for name, kind, coords in instances:
+        for solver in args.solvers:
+            if solver == "held_karp" and len(coords) > RouteOptimizer.HELD_KARP_LIMIT:
+                continue
+            result, elapsed, _ = run_solver(coords, solver, args, measure_memory=False)
+            peak = None
+            if not args.skip_memory:
+                peak = run_solver(coords, solver, args, measure_memory=True)[2]
+            results.append({
+                "instance": name, "kind": kind, "n": len(coords), "solver": solver,
+                "wall_time_s": round(elapsed, 4),
+                "peak_memory_kib": None if peak is None else round(peak / 1024, 1),
+                "length_km": round(result.distance, 4),
+                "lower_bound_km": round(result.lower_bound, 4),
+                "stop_reason": result.stop_reason, "iterations": result.iterations,
+            })
+            best_known[name] = min(best_known.get(name, np.inf), result.distance)
+            print(f"{name:<16} {solver:<11} {elapsed:>8.3f}s {result.distance:>10.3f} km "
+                  f"{result.stop_reason}", flush=True)
+
+    for r in results:
+        r["best_known_km"] = round(best_known[r["instance"]], 4)
+        r["gap"] = round(r["length_km"] / best_known[r["instance"]] - 1.0, 5) if best_known[r["instance"]] else 0.0
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "numba": HAS_NUMBA, "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.best_known and args.update_best_known:
+        with open(args.best_known, "w") as f:
+            json.dump({k: round(v, 4) for k, v in sorted(best_known.items())}, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
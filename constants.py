@@ -2,4 +2,9 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "2025-06-16T12-18_export.csv")
-AUTH_FILE = os.path.join(BASE_DIR, "authorized_users.json")
\ No newline at end of file
+EXPORT_DIR = BASE_DIR
+EXPORT_PATTERN = "*_export.csv"
+AUTH_FILE = os.path.join(BASE_DIR, "authorized_users.json")
+ROUTE_CACHE_FILE = os.path.join(BASE_DIR, "route_cache.sqlite3")
+OUTLET_STORE_FILE = os.path.join(BASE_DIR, "outlets.arrow")
+BEAT_ALIAS_FILE = os.path.join(BASE_DIR, "beat_aliases.json")
\ No newline at end of file
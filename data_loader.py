@@ -1,25 +1,79 @@
-import pandas as pd
 import streamlit as st
 from exceptions import DataError  # Fixed import
-from constants import DATA_FILE
+from constants import EXPORT_DIR
+from outlet_store import OutletStore
+from beat_index import BeatIndex
+from beat_aliases import BeatAliases
+from route_cache import coords_hash
 
 class DataLoader:
-    @st.cache_data
-    def load_data(_self):
+    def __init__(self, route_cache=None, outlet_store=None, beat_aliases=None, source=EXPORT_DIR):
+        # source is a single export CSV or a directory of timestamped exports.
+        self.route_cache = route_cache
+        self.outlet_store = outlet_store or OutletStore(source)
+        self.beat_aliases = beat_aliases or BeatAliases()
+
+    def data_version(self):
+        try:
+            return self.outlet_store.source_version()
+        except OSError as e:
+            raise DataError(f"Data loading error: {e}")
+
+    def display_version(self):
+        # Changes whenever what the pages show changes: outlet data or beat names.
+        return f"{self.data_version()}:{self.beat_aliases.version()}"
+
+    def load_data(self):
+        # Every session and rerun gets the same shared frame for a given data and
+        # alias version, so callers slice it and never modify it in place.
+        return self._display_data(self.data_version(), self.beat_aliases.version())
+
+    def load_beat_index(self):
+        return self._display_beat_index(self.data_version(), self.beat_aliases.version())
+
+    def rename_beat(self, old_name, new_name):
+        self.beat_aliases.rename(old_name, new_name)
+        if self.route_cache is not None:
+            # The last route follows the beat, so its next edit still warm-starts.
+            self.route_cache.rename_beat(old_name, new_name)
+
+    def sync_route_cache(self, dff, data_version):
+        beat_hashes = [coords_hash(group[["lat", "longi"]].values)
+                       for _, group in dff.groupby("full_beat", sort=False, observed=True)]
+        self.route_cache.sync_data_version(data_version, beat_hashes)
+
+    @st.cache_resource(max_entries=2)
+    def _load_data(_self, data_version):
         try:
-            dff = pd.read_csv(DATA_FILE)
-            
-            for col in dff.select_dtypes(include='object').columns:
-                dff[col] = dff[col].astype(str).fillna("").replace("nan", "")
-            
-            dff["lat"] = pd.to_numeric(dff["lat"], errors="coerce")
-            dff["longi"] = pd.to_numeric(dff["longi"], errors="coerce")
-            
-            dff = dff.dropna(subset=["lat", "longi"])
-            dff = dff[(dff['lat'] != 0) | (dff['longi'] != 0)]
-            
-            dff["outlet_id"] = dff["outlet_name"] + "_" + dff["lat"].astype(str) + "_" + dff["longi"].astype(str)
-            
+            # Cleaned, typed columns come from the compiled store; the CSV is
+            # only parsed again when its contents change.
+            dff = _self.outlet_store.load()
+
+            # Runs once per CSV version: drop cached routes of beats whose outlets changed.
+            if _self.route_cache is not None:
+                _self.sync_route_cache(dff, data_version)
+
             return dff
+        except DataError:
+            raise
         except Exception as e:
-            raise DataError(f"Data loading error: {e}")
\ No newline at end of file
+            raise DataError(f"Data loading error: {e}")
+
+    @st.cache_resource(max_entries=2)
+    def _display_data(_self, data_version, alias_version):
+        # Beat renames live in the alias table and are applied on top of the
+        # loaded outlets, so a rename never reloads or copies the data.
+        return _self.beat_aliases.apply(_self._load_data(data_version))
+
+    @st.cache_resource(max_entries=2)
+    def _load_beat_index(_self, data_version):
+        try:
+            return BeatIndex(_self._load_data(data_version))
+        except DataError:
+            raise
+        except Exception as e:
+            raise DataError(f"Beat index build failed: {e}")
+
+    @st.cache_resource(max_entries=2)
+    def _display_beat_index(_self, data_version, alias_version):
+        return _self._load_beat_index(data_version).renamed(_self.beat_aliases.load())
@@ -2,4 +2,5 @@ class AuthError(Exception): pass
 class DataError(Exception): pass
 class RouteOptimizationError(Exception): pass
 class MapError(Exception): pass
-class AdminError(Exception): pass
\ No newline at end of file
+class AdminError(Exception): pass
+class RouteQueueFullError(RouteOptimizationError): pass
\ No newline at end of file
@@ -0,0 +1,171 @@
+import time
+import numpy as np
+from local_search import HAS_NUMBA, TwoOptEngine
+
+if HAS_NUMBA:
+    from numba import njit
+
+ELITE_SIZE = 10
+PARENT_POOL = 50
+
+
+def ga_parameters(n):
+    population_size = min(200, max(50, n * 2))
+    generations = min(1000, max(100, n * 5))
+    mutation_rate = max(0.01, min(0.1, 0.5 / n))
+    return population_size, generations, mutation_rate
+
+
+def _route_lengths_numpy(routes, dist, out):
+    np.sum(dist[routes[:, :-1], routes[:, 1:]], axis=1, out=out)
+
+
+def _crossover_numpy(p1, p2, a, b, taken, mask, out):
+    # Child = p2 without p1[a:b], followed by p1[a:b]; written straight into out.
+    taken[:] = False
+    taken[p1[a:b]] = True
+    np.take(taken, p2, out=mask)
+    np.logical_not(mask, out=mask)
+    split = len(out) - (b - a)
+    np.compress(mask, p2, out=out[:split])
+    out[split:] = p1[a:b]
+
+
+def _route_lengths_loop(routes, dist, out):
+    for r in range(routes.shape[0]):
+        total = 0.0
+        for k in range(routes.shape[1] - 1):
+            total += dist[routes[r, k], routes[r, k + 1]]
+        out[r] = total
+
+
+def _crossover_loop(p1, p2, a, b, taken, mask, out):
+    taken[:] = False
+    for k in range(a, b):
+        taken[p1[k]] = True
+    m = 0
+    for k in range(len(p2)):
+        if not taken[p2[k]]:
+            out[m] = p2[k]
+            m += 1
+    for k in range(a, b):
+        out[m] = p1[k]
+        m += 1
+
+
+if HAS_NUMBA:
+    route_lengths = njit(cache=True, nogil=True)(_route_lengths_loop)
+    crossover = njit(cache=True, nogil=True)(_crossover_loop)
+else:
+    route_lengths = _route_lengths_numpy
+    crossover = _crossover_numpy
+
+
+class Population:
+    def __init__(self, routes, dist_matrix, lengths=None):
+        self.routes = np.ascontiguousarray(routes, dtype=np.int64)
+        self.offspring = np.empty_like(self.routes)
+        self.dist = dist_matrix
+        self.lengths = np.empty(len(self.routes), dtype=np.float64)
+        n = self.routes.shape[1]
+        self._taken = np.zeros(n, dtype=bool)
+        self._mask = np.zeros(n, dtype=bool)
+        if lengths is None:
+            self.evaluate()
+        else:
+            self.lengths[:] = lengths
+
+    @classmethod
+    def random(cls, n, size, two_opt, rng, dist_matrix):
+        routes = np.empty((size, n), dtype=np.int64)
+        for k in range(size):
+            routes[k] = rng.permutation(n)
+            two_opt.improve_inplace(routes[k])
+        return cls(routes, dist_matrix)
+
+    def __getstate__(self):
+        # Only routes and their lengths travel between processes. Workers got
+        # the distance matrix once from init_island_worker; the parent
+        # re-attaches its own with attach().
+        return {"routes": self.routes, "lengths": self.lengths}
+
+    def __setstate__(self, state):
+        self.__init__(state["routes"], _island_dist, state["lengths"])
+
+    def attach(self, dist_matrix):
+        self.dist = dist_matrix
+        return self
+
+    def evaluate(self):
+        route_lengths(self.routes, self.dist, self.lengths)
+
+    def best(self):
+        k = int(np.argmin(self.lengths))
+        return self.routes[k].copy(), float(self.lengths[k])
+
+    def elites(self, count):
+        return self.routes[np.argsort(self.lengths)[:count]].copy()
+
+    def replace_worst(self, routes):
+        worst = np.argsort(self.lengths)[len(self.lengths) - len(routes):]
+        self.routes[worst] = routes
+        self.evaluate()
+
+    def next_generation(self, two_opt, rng, mutation_rate):
+        size, n = self.routes.shape
+        order = np.argsort(self.lengths)
+        elite = min(ELITE_SIZE, size)
+        np.take(self.routes, order[:elite], axis=0, out=self.offspring[:elite])
+
+        children = size - elite
+        parents = order[:PARENT_POOL][rng.integers(0, min(PARENT_POOL, size), size=(children, 2))]
+        cut_a = rng.integers(0, n, size=children)
+        cut_b = rng.integers(0, n - 1, size=children)
+        cut_b += cut_b >= cut_a
+        lo, hi = np.minimum(cut_a, cut_b), np.maximum(cut_a, cut_b)
+        mutate = rng.random(children) < mutation_rate
+        swap_i = rng.integers(0, n, size=children)
+        swap_j = rng.integers(0, n, size=children)
+
+        for k in range(children):
+            child = self.offspring[elite + k]
+            crossover(self.routes[parents[k, 0]], self.routes[parents[k, 1]],
+                      lo[k], hi[k], self._taken, self._mask, child)
+            if mutate[k]:
+                i, j = swap_i[k], swap_j[k]
+                child[i], child[j] = child[j], child[i]
+            two_opt.improve_inplace(child)
+
+        self.routes, self.offspring = self.offspring, self.routes
+        self.evaluate()
+
+
+_island_dist = None
+_island_two_opt = None
+
+
+def init_island_worker(dist_matrix):
+    # Each pool process keeps the matrix and builds its 2-opt engine once
+    # instead of receiving them with every task.
+    global _island_dist, _island_two_opt
+    _island_dist = dist_matrix
+    _island_two_opt = TwoOptEngine(dist_matrix)
+
+
+def evolve_island(population, generations, seed, mutation_rate, deadline=None, two_opt=None):
+    # deadline is wall-clock time.time(), comparable across worker processes.
+    two_opt = two_opt or _island_two_opt
+    rng = np.random.default_rng(seed)
+    for _ in range(generations):
+        if deadline is not None and time.time() >= deadline:
+            break
+        population.next_generation(two_opt, rng, mutation_rate)
+    return population
+
+
+def migrate(islands, migrants):
+    # Ring topology: each island's best routes replace the next island's worst.
+    elites = [island.elites(migrants) for island in islands]
+    for k, island in enumerate(islands):
+        island.replace_worst(elites[k - 1])
+    return islands
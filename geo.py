@@ -0,0 +1,69 @@
+import numpy as np
+from geopy.distance import geodesic
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _radians(coords, dtype):
+    coords = np.radians(np.asarray(coords, dtype=np.float64)).astype(dtype, copy=False)
+    return coords[:, 0], coords[:, 1]
+
+
+def haversine_matrix(coords, dtype=np.float64):
+    lat, lon = _radians(coords, dtype)
+    sin_dlat = np.sin((lat[:, None] - lat[None, :]) * 0.5)
+    sin_dlon = np.sin((lon[:, None] - lon[None, :]) * 0.5)
+    cos_lat = np.cos(lat)
+    a = sin_dlat * sin_dlat
+    a += (cos_lat[:, None] * cos_lat[None, :]) * (sin_dlon * sin_dlon)
+    np.clip(a, 0.0, 1.0, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= dtype(2.0 * EARTH_RADIUS_KM)
+    return a
+
+
+def equirectangular_matrix(coords, dtype=np.float64):
+    # Projects onto a plane tangent at the beat's mean latitude. Within a beat
+    # (a few tens of km) this stays well under 0.1% of the haversine distance.
+    lat, lon = _radians(coords, dtype)
+    x = lon * np.cos(lat.mean(dtype=np.float64)).astype(dtype) * dtype(EARTH_RADIUS_KM)
+    y = lat * dtype(EARTH_RADIUS_KM)
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    return np.hypot(dx, dy, out=dx)
+
+
+def haversine_distances(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def leg_distances(lat, lon, exact=False):
+    # legs[i] is the distance from stop i-1 to stop i (0 for the first stop).
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    legs = np.zeros(len(lat), dtype=np.float64)
+    if len(lat) > 1:
+        if exact:
+            legs[1:] = [geodesic(p1, p2).km for p1, p2 in
+                        zip(zip(lat[:-1], lon[:-1]), zip(lat[1:], lon[1:]))]
+        else:
+            legs[1:] = haversine_distances(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    return legs, np.cumsum(legs)
+
+
+METRICS = {
+    "haversine": haversine_matrix,
+    "equirectangular": equirectangular_matrix,
+}
+
+
+def distance_matrix_km(coords, metric="haversine", dtype="float64"):
+    if metric not in METRICS:
+        raise ValueError(f"Unknown distance metric: {metric}")
+    dtype = np.dtype(dtype).type
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"Unsupported distance matrix dtype: {dtype.__name__}")
+    return METRICS[metric](coords, dtype)
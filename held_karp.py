@@ -0,0 +1,116 @@
+import time
+import numpy as np
+
+# Routes are open paths, i.e. tours through a dummy node at zero distance from
+# every outlet; both the exact DP and the bound below work on that view.
+
+
+def held_karp_path(dist_matrix):
+    # Exact shortest open path by dynamic programming over subsets:
+    # cost[mask, j] is the shortest path visiting the outlets in mask and
+    # ending at j. Masks are processed one popcount layer at a time, so each
+    # layer is a single (masks x n x n) numpy reduction. O(2^n n^2) time and
+    # O(2^n n) memory, so only for small beats.
+    dist_matrix = np.asarray(dist_matrix, dtype=np.float64)
+    n = len(dist_matrix)
+    if n < 3:
+        return np.arange(n)
+    size = 1 << n
+    cost = np.full((size, n), np.inf)
+    parent = np.full((size, n), -1, dtype=np.int8 if n < 128 else np.int64)
+    bits = 1 << np.arange(n)
+    cost[bits, np.arange(n)] = 0.0
+
+    masks = np.arange(size)
+    popcount = np.zeros(size, dtype=np.int64)
+    for bit in bits:
+        popcount += (masks & bit) > 0
+
+    for count in range(1, n):
+        layer = masks[popcount == count]
+        # extended[m, j, t]: path over layer[m] ending at j, then on to t.
+        extended = cost[layer][:, :, None] + dist_matrix[None, :, :]
+        best_prev = extended.argmin(axis=1)
+        best_cost = np.take_along_axis(extended, best_prev[:, None, :], axis=1)[:, 0, :]
+        for t in range(n):
+            open_masks = (layer & bits[t]) == 0
+            targets = layer[open_masks] | bits[t]
+            cost[targets, t] = best_cost[open_masks, t]
+            parent[targets, t] = best_prev[open_masks, t]
+
+    mask = size - 1
+    last = int(cost[mask].argmin())
+    route = [last]
+    while mask != bits[last]:
+        prev = int(parent[mask, last])
+        mask ^= int(bits[last])
+        last = prev
+        route.append(last)
+    return np.asarray(route[::-1], dtype=np.int64)
+
+
+def _prim(costs):
+    # Dense Prim: O(n^2) with one vectorized update per added node. Works with
+    # negative weights, which penalized costs can have.
+    n = len(costs)
+    in_tree = np.zeros(n, dtype=bool)
+    link = np.zeros(n, dtype=np.int64)
+    best = costs[0].copy()
+    in_tree[0] = True
+    best[0] = np.inf
+    for _ in range(n - 1):
+        node = int(best.argmin())
+        in_tree[node] = True
+        best[node] = np.inf
+        closer = ~in_tree & (costs[node] < best)
+        best[closer] = costs[node][closer]
+        link[closer] = node
+    return link
+
+
+def _one_tree(dist_matrix, pi):
+    # Minimum 1-tree under penalties pi: a spanning tree over the outlets plus
+    # the two cheapest edges to the dummy node. Returns its penalized weight
+    # and every outlet's degree.
+    n = len(dist_matrix)
+    costs = dist_matrix + pi[:, None] + pi[None, :]
+    link = _prim(costs)
+    children = np.arange(1, n)
+    degree = np.bincount(children, minlength=n) + np.bincount(link[children], minlength=n)
+    dummy = np.argpartition(pi, 1)[:2]
+    degree[dummy] += 1
+    weight = float(costs[children, link[children]].sum()) + float(pi[dummy].sum())
+    return weight, degree
+
+
+def held_karp_bound(dist_matrix, upper_bound, iterations=100, time_limit=None):
+    # Held-Karp lower bound on the shortest open path: subgradient ascent on
+    # the outlet penalties of the 1-tree relaxation. With zero penalties this
+    # is the MST bound, so it is never weaker than that.
+    dist_matrix = np.asarray(dist_matrix, dtype=np.float64)
+    n = len(dist_matrix)
+    if n < 3:
+        return 0.0
+    start = time.perf_counter()
+    pi = np.zeros(n)
+    best = -np.inf
+    step_scale = 2.0
+    stalled = 0
+    for _ in range(iterations):
+        weight, degree = _one_tree(dist_matrix, pi)
+        bound = weight - 2.0 * pi.sum()
+        if bound > best + 1e-9:
+            best, stalled = bound, 0
+        else:
+            stalled += 1
+            if stalled >= 5:
+                step_scale, stalled = step_scale / 2.0, 0
+        subgradient = degree - 2
+        norm = float(subgradient @ subgradient)
+        if norm == 0:
+            # Every outlet has degree 2: the 1-tree is a path, hence optimal.
+            break
+        if step_scale < 1e-4 or (time_limit is not None and time.perf_counter() - start >= time_limit):
+            break
+        pi += step_scale * max(upper_bound - bound, 1e-9) / norm * subgradient
+    return max(0.0, best)
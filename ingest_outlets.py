@@ -0,0 +1,60 @@
+import argparse
+import sys
+import precompute_routes
+from outlet_store import CHUNK_SIZE, OutletStore
+from exceptions import DataError
+from constants import EXPORT_DIR, OUTLET_STORE_FILE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream an outlet export into the compiled outlet store."
+    )
+    parser.add_argument("source", nargs="?", default=EXPORT_DIR,
+                        help="outlet export CSV or directory of *_export.csv files")
+    parser.add_argument("--store", default=OUTLET_STORE_FILE, help="compiled outlet store")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild from every export even if the store is up to date")
+    parser.add_argument("--precompute", action="store_true",
+                        help="then recompute routes for beats whose outlets changed")
+    parser.add_argument("--workers", type=int, default=None, help="route precompute worker processes")
+    return parser.parse_args(argv)
+
+
+def print_progress(report):
+    print(f"  chunk {report.chunks:>4}: {report.rows_read:>10} rows read "
+          f"{report.rows_written:>10} written  {report.rows_per_sec:>10.0f} rows/sec")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = OutletStore(args.source, args.store)
+    if not args.force and store.is_fresh():
+        print(f"{args.store} is up to date with {args.source}")
+    else:
+        try:
+            report = store.build(chunk_size=args.chunk_size, progress=print_progress,
+                                 incremental=not args.force)
+        except DataError as e:
+            print(e, file=sys.stderr)
+            return 1
+
+        rejected = sum(report.rejected.values())
+        print(f"Done: {report.files} exports, {report.rows_read} rows read in {report.elapsed:.2f}s "
+              f"({report.rows_per_sec:.0f} rows/sec), {rejected} rejected")
+        print(f"Store: {report.rows_written} outlets, {report.rows_kept} kept from the previous store, "
+              f"{report.rows_updated} replaced by newer exports")
+        for reason, count in report.rejected.items():
+            print(f"  {reason:<14} {count:>8}")
+
+    if args.precompute:
+        precompute_args = ["--source", args.source, "--store", args.store]
+        if args.workers:
+            precompute_args += ["--workers", str(args.workers)]
+        return precompute_routes.main(precompute_args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
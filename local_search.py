@@ -0,0 +1,432 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+EPS = 1e-10
+# float32 matrices carry ~1e-6 relative rounding error; a looser tolerance (in km)
+# keeps a move and its inverse from both looking like improvements.
+FLOAT32_EPS = 1e-4
+
+# Routes are open paths with free endpoints. Internally a route is padded with a
+# dummy node (index n, zero distance to every outlet) at both ends, so a 2-opt
+# move is always "reverse tour[i..j]" for 1 <= i < j <= n, endpoints included.
+
+
+def padded_matrix(dist_matrix):
+    dist_matrix = np.asarray(dist_matrix)
+    n = len(dist_matrix)
+    padded = np.zeros((n + 1, n + 1), dtype=np.result_type(dist_matrix.dtype, np.float32))
+    padded[:n, :n] = dist_matrix
+    return padded
+
+
+def tolerance(dist_matrix):
+    return FLOAT32_EPS if dist_matrix.dtype == np.float32 else EPS
+
+
+def nearest_neighbors(dist_matrix, k):
+    n = len(dist_matrix)
+    k = max(1, min(k, n - 1))
+    d = np.array(dist_matrix, dtype=np.float64)
+    np.fill_diagonal(d, np.inf)
+    nbrs = np.argpartition(d, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(d, nbrs, axis=1), axis=1)
+    return np.take_along_axis(nbrs, order, axis=1).astype(np.int64)
+
+
+def _pad_route(route, n):
+    tour = np.empty(len(route) + 2, dtype=np.int64)
+    tour[0] = tour[-1] = n
+    tour[1:-1] = route
+    return tour
+
+
+def _select_disjoint(i_idx, j_idx, deltas, n, eps):
+    # Greedily keep the best improving moves whose segments (plus their
+    # boundary nodes) do not touch, so all of them can be applied in one pass.
+    improving = np.flatnonzero(deltas < -eps)
+    improving = improving[np.argsort(deltas[improving])]
+    used = bytearray(n + 2)
+    taken = []
+    for i, j in zip(i_idx[improving].tolist(), j_idx[improving].tolist()):
+        if 1 not in used[i - 1:j + 2]:
+            used[i - 1:j + 2] = b"\x01" * (j - i + 3)
+            taken.append((i, j))
+    return taken
+
+
+# Kernels improve tour in place, one pass over all moves at a time, until a
+# pass finds nothing or max_passes (if positive) is used up. They return True
+# when they stopped with improvements possibly left.
+
+
+def two_opt_numpy_full(tour, dist, eps=EPS, max_passes=0):
+    n = len(tour) - 2
+    passes = 0
+    while True:
+        if 0 < max_passes <= passes:
+            return True
+        passes += 1
+        prev, cur, nxt = tour[:-2], tour[1:-1], tour[2:]
+        e_in = dist[prev, cur]
+        e_out = dist[cur, nxt]
+        delta = (dist[prev[:, None], cur[None, :]] + dist[cur[:, None], nxt[None, :]]
+                 - e_in[:, None] - e_out[None, :])
+        delta[np.tril_indices(n)] = np.inf
+        rows = np.arange(n)
+        best_j = np.argmin(delta, axis=1)
+        best = delta[rows, best_j]
+        moves = _select_disjoint(rows + 1, best_j + 1, best, n, eps)
+        if not moves:
+            return False
+        for i, j in moves:
+            tour[i:j + 1] = tour[i:j + 1][::-1]
+
+
+def two_opt_numpy_neighbors(tour, dist, nbrs, eps=EPS, max_passes=0):
+    n = len(tour) - 2
+    pos = np.empty(n + 1, dtype=np.int64)
+    k = nbrs.shape[1]
+    positions = np.arange(1, n + 1)
+    passes = 0
+    while True:
+        if 0 < max_passes <= passes:
+            return True
+        passes += 1
+        pos[tour[1:-1]] = positions
+        px = np.repeat(positions, k)
+        py = pos[nbrs[tour[1:-1]].ravel()]
+        fwd = py > px + 1
+        bwd = py < px - 1
+        i_idx = np.concatenate([px[fwd] + 1, py[bwd], np.ones(n - 1, np.int64), positions[1:]])
+        j_idx = np.concatenate([py[fwd], px[bwd] - 1, positions[1:], np.full(n - 1, n)])
+        a, b, c, d = tour[i_idx - 1], tour[i_idx], tour[j_idx], tour[j_idx + 1]
+        deltas = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        moves = _select_disjoint(i_idx, j_idx, deltas, n, eps)
+        if not moves:
+            return False
+        for i, j in moves:
+            tour[i:j + 1] = tour[i:j + 1][::-1]
+
+
+def two_opt_python(tour, dist, nbrs=None, eps=EPS, max_passes=0):
+    n = len(tour) - 2
+    pos = [0] * (n + 1)
+    improved = True
+    passes = 0
+    while improved:
+        if 0 < max_passes <= passes:
+            return True
+        passes += 1
+        improved = False
+        for p in range(1, n + 1):
+            pos[tour[p]] = p
+        for i in range(1, n):
+            if nbrs is None or i == 1:
+                candidates = range(i + 1, n + 1)
+            else:
+                candidates = sorted({pos[c] for c in nbrs[tour[i - 1]] if pos[c] > i} | {n})
+            for j in candidates:
+                a, b, c, d = tour[i - 1], tour[i], tour[j], tour[j + 1]
+                if dist[a, c] + dist[b, d] < dist[a, b] + dist[c, d] - eps:
+                    tour[i:j + 1] = tour[i:j + 1][::-1]
+                    for p in range(i, j + 1):
+                        pos[tour[p]] = p
+                    improved = True
+                    break
+    return False
+
+
+# Kernels release the GIL: background route jobs run on threads next to the
+# Streamlit script threads, which keep running while a kernel does.
+if HAS_NUMBA:
+    @njit(cache=True, nogil=True)
+    def _reverse(tour, pos, i, j):
+        while i < j:
+            tour[i], tour[j] = tour[j], tour[i]
+            pos[tour[i]] = i
+            pos[tour[j]] = j
+            i += 1
+            j -= 1
+        if i == j:
+            pos[tour[i]] = i
+
+    @njit(cache=True, nogil=True)
+    def _gain(tour, dist, i, j):
+        a, b, c, d = tour[i - 1], tour[i], tour[j], tour[j + 1]
+        return dist[a, b] + dist[c, d] - dist[a, c] - dist[b, d]
+
+    @njit(cache=True, nogil=True)
+    def two_opt_numba(tour, dist, nbrs, use_nbrs, eps, max_passes):
+        n = len(tour) - 2
+        pos = np.empty(n + 1, dtype=np.int64)
+        for p in range(n + 2):
+            pos[tour[p]] = p
+        improved = True
+        passes = 0
+        while improved:
+            if 0 < max_passes <= passes:
+                return True
+            passes += 1
+            improved = False
+            for i in range(1, n):
+                if use_nbrs:
+                    # Moves creating edge (tour[i-1], c) for a near neighbour c,
+                    # plus reversing the suffix so the path can end anywhere.
+                    if tour[i - 1] < n:
+                        for c in nbrs[tour[i - 1]]:
+                            j = pos[c]
+                            if j > i and _gain(tour, dist, i, j) > eps:
+                                _reverse(tour, pos, i, j)
+                                improved = True
+                    for c in nbrs[tour[i]]:
+                        j = pos[c] - 1
+                        if j > i and _gain(tour, dist, i, j) > eps:
+                            _reverse(tour, pos, i, j)
+                            improved = True
+                    if _gain(tour, dist, i, n) > eps:
+                        _reverse(tour, pos, i, n)
+                        improved = True
+                    if _gain(tour, dist, 1, i) > eps:
+                        _reverse(tour, pos, 1, i)
+                        improved = True
+                else:
+                    for j in range(i + 1, n + 1):
+                        if _gain(tour, dist, i, j) > eps:
+                            _reverse(tour, pos, i, j)
+                            improved = True
+        return False
+
+
+class TwoOptEngine:
+    BACKENDS = ("auto", "numba", "numpy", "python")
+    MODES = ("auto", "full", "neighbors")
+    FULL_MODE_MAX_SIZE = 150
+
+    def __init__(self, dist_matrix, mode="auto", backend="auto", neighbors=10):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown 2-opt backend: {backend}")
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown 2-opt mode: {mode}")
+        if backend == "auto":
+            backend = "numba" if HAS_NUMBA else "numpy"
+        elif backend == "numba" and not HAS_NUMBA:
+            raise ValueError("numba is not installed")
+
+        self.n = len(dist_matrix)
+        if mode == "auto":
+            mode = "full" if self.n <= self.FULL_MODE_MAX_SIZE else "neighbors"
+        self.mode = mode
+        self.backend = backend
+        self.dist = padded_matrix(dist_matrix)
+        self.eps = tolerance(self.dist)
+        self._tour = _pad_route(np.arange(self.n), self.n)
+        if mode == "neighbors":
+            self.nbrs = nearest_neighbors(self.dist[:self.n, :self.n], neighbors)
+        else:
+            self.nbrs = np.empty((0, 0), dtype=np.int64)
+
+    def improve(self, route, budget=None):
+        return self.improve_inplace(np.array(route, dtype=np.int64), budget)
+
+    def improve_inplace(self, route, budget=None):
+        # Reuses one padded tour buffer, so repeated calls (one per GA child)
+        # do not allocate. With a budget, it is checked between passes.
+        if self.n < 3:
+            return route
+        tour = self._tour
+        tour[1:-1] = route
+        if budget is None:
+            self._passes(tour, 0)
+        else:
+            while self._passes(tour, 1) and not budget.exhausted():
+                pass
+        route[:] = tour[1:-1]
+        return route
+
+    def _passes(self, tour, max_passes):
+        use_nbrs = self.mode == "neighbors"
+        if self.backend == "numba":
+            return two_opt_numba(tour, self.dist, self.nbrs, use_nbrs, self.eps, max_passes)
+        if self.backend == "numpy":
+            if use_nbrs:
+                return two_opt_numpy_neighbors(tour, self.dist, self.nbrs, self.eps, max_passes)
+            return two_opt_numpy_full(tour, self.dist, self.eps, max_passes)
+        return two_opt_python(tour, self.dist, self.nbrs if use_nbrs else None, self.eps, max_passes)
+
+
+def path_length(route, dist_matrix):
+    route = np.asarray(route)
+    if len(route) < 2:
+        return 0.0
+    return float(dist_matrix[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbor_route(dist_matrix, starts=None, budget=None):
+    # With a budget, no further starts are tried once it is exhausted.
+    n = len(dist_matrix)
+    if starts is None:
+        starts = range(n)
+    best, best_length = None, np.inf
+    for start in starts:
+        if best is not None and budget is not None and budget.exhausted():
+            break
+        visited = np.zeros(n, dtype=bool)
+        route = np.empty(n, dtype=np.int64)
+        route[0] = current = start
+        visited[start] = True
+        for k in range(1, n):
+            row = np.where(visited, np.inf, dist_matrix[current])
+            current = int(np.argmin(row))
+            route[k] = current
+            visited[current] = True
+        length = path_length(route, dist_matrix)
+        if length < best_length:
+            best, best_length = route, length
+    return best
+
+
+def cheapest_insertion(route, nodes, dist_matrix):
+    # Inserts each node where it lengthens the open path least: before the
+    # first stop, after the last, or between two neighbouring stops.
+    route = [int(i) for i in route]
+    for node in nodes:
+        if not route:
+            route.append(int(node))
+            continue
+        stops = np.asarray(route)
+        between = dist_matrix[stops[:-1], node] + dist_matrix[node, stops[1:]] - dist_matrix[stops[:-1], stops[1:]]
+        costs = np.concatenate([[dist_matrix[node, stops[0]]], between, [dist_matrix[stops[-1], node]]])
+        route.insert(int(np.argmin(costs)), int(node))
+    return np.asarray(route, dtype=np.int64)
+
+
+def double_bridge(route, rng):
+    n = len(route)
+    if n < 8:
+        return route[rng.permutation(n)]
+    a, b, c = np.sort(rng.choice(np.arange(1, n), size=3, replace=False))
+    return np.concatenate([route[:a], route[b:c], route[a:b], route[c:]])
+
+
+def _move_segment(tour, pos, i, length, p, reverse):
+    # Moves tour[i:i+length] between positions p and p+1 (p outside the segment).
+    seg = tour[i:i + length].copy()
+    if reverse:
+        seg = seg[::-1].copy()
+    if p > i:
+        for k in range(i, p - length + 1):
+            tour[k] = tour[k + length]
+        start, lo, hi = p - length + 1, i, p
+    else:
+        for k in range(i + length - 1, p + length, -1):
+            tour[k] = tour[k - length]
+        start, lo, hi = p + 1, p + 1, i + length - 1
+    for k in range(length):
+        tour[start + k] = seg[k]
+    for k in range(lo, hi + 1):
+        pos[tour[k]] = k
+
+
+def _or_gain(tour, dist, i, length, p, reverse):
+    a, s, e, b = tour[i - 1], tour[i], tour[i + length - 1], tour[i + length]
+    c, d = tour[p], tour[p + 1]
+    removed = dist[a, s] + dist[e, b] + dist[c, d]
+    if reverse:
+        added = dist[a, b] + dist[c, e] + dist[s, d]
+    else:
+        added = dist[a, b] + dist[c, s] + dist[e, d]
+    return removed - added
+
+
+def _or_opt_impl(tour, dist, nbrs, use_nbrs, max_segment, allow_reverse, eps, max_passes):
+    # Or-opt: relocate segments of 1..max_segment outlets, optionally reversed
+    # (the "or-3opt" variant), until no relocation shortens the path.
+    n = len(tour) - 2
+    pos = np.empty(n + 1, dtype=np.int64)
+    for k in range(n + 2):
+        pos[tour[k]] = k
+    candidates = np.empty(4 * nbrs.shape[1] + 2, dtype=np.int64)
+    improved = True
+    passes = 0
+    while improved:
+        if 0 < max_passes <= passes:
+            return True
+        passes += 1
+        improved = False
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i <= n - length + 1:
+                count = 0
+                if use_nbrs:
+                    for end in (tour[i], tour[i + length - 1]):
+                        for c in nbrs[end]:
+                            candidates[count] = pos[c]
+                            candidates[count + 1] = pos[c] - 1
+                            count += 2
+                    candidates[count] = 0
+                    candidates[count + 1] = n
+                    count += 2
+                moved = False
+                total = count if use_nbrs else n + 1
+                for k in range(total):
+                    p = candidates[k] if use_nbrs else k
+                    if p >= i - 1 and p <= i + length - 1:
+                        continue
+                    for reverse in (False, True):
+                        if reverse and not allow_reverse:
+                            continue
+                        if _or_gain(tour, dist, i, length, p, reverse) > eps:
+                            _move_segment(tour, pos, i, length, p, reverse)
+                            moved = True
+                            break
+                    if moved:
+                        break
+                if moved:
+                    improved = True
+                else:
+                    i += 1
+    return False
+
+
+if HAS_NUMBA:
+    _move_segment = njit(cache=True, nogil=True)(_move_segment)
+    _or_gain = njit(cache=True, nogil=True)(_or_gain)
+    or_opt_kernel = njit(cache=True, nogil=True)(_or_opt_impl)
+else:
+    or_opt_kernel = _or_opt_impl
+
+
+class OrOptEngine:
+    def __init__(self, dist_matrix, neighbors=10, max_segment=3, allow_reverse=False):
+        self.n = len(dist_matrix)
+        self.dist = padded_matrix(dist_matrix)
+        self.eps = tolerance(self.dist)
+        self.use_nbrs = neighbors is not None and self.n > neighbors + 1
+        if self.use_nbrs:
+            self.nbrs = nearest_neighbors(self.dist[:self.n, :self.n], neighbors)
+        else:
+            self.nbrs = np.empty((0, 0), dtype=np.int64)
+        self.max_segment = max_segment
+        self.allow_reverse = allow_reverse
+
+    def improve(self, route, budget=None):
+        # With a budget, it is checked between passes.
+        route = np.asarray(route, dtype=np.int64)
+        if self.n < 3:
+            return route.copy()
+        tour = _pad_route(route, self.n)
+        if budget is None:
+            self._passes(tour, 0)
+        else:
+            while self._passes(tour, 1) and not budget.exhausted():
+                pass
+        return tour[1:-1].copy()
+
+    def _passes(self, tour, max_passes):
+        return or_opt_kernel(tour, self.dist, self.nbrs, self.use_nbrs, min(self.max_segment, self.n - 1),
+                             self.allow_reverse, self.eps, max_passes)
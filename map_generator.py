@@ -1,19 +1,116 @@
+import hashlib
+import numpy as np
+import pandas as pd
 import plotly.express as px
+import plotly.io as pio
 import folium
 from streamlit_folium import st_folium
 from exceptions import MapError  # Fixed import
 
 class MapGenerator:
+    # Multi-beat views are drawn as per-beat grid clusters; individual outlets
+    # are only sent for a single beat, and never more than MAX_POINTS of them.
+    MAX_POINTS = 5000
+    MAX_CLUSTERS = 1500
+    CLUSTER_CELL_DEG = 0.01
+    # Larger route maps draw stops from a single GeoJSON layer instead of one
+    # Marker object (with its own icon and popup) per outlet.
+    COMPACT_MIN_STOPS = 25
+    STOP_COLORS = {"start": "green", "stop": "#0066cc", "end": "red"}
+
+    def __init__(self, figure_cache=None):
+        self.figure_cache = figure_cache
+
+    @staticmethod
+    def route_hash(sorted_df):
+        coords = np.ascontiguousarray(sorted_df[["lat", "longi"]].to_numpy(dtype=np.float64))
+        return hashlib.sha256(coords.tobytes()).hexdigest()
+
+    def _cached(self, key, build):
+        if self.figure_cache is None:
+            return build()
+        return self.figure_cache.get_or_build(self.figure_cache.make_key(*key), build)
+
+    def plotly_map(self, df, view_key, marker_size=8):
+        # view_key identifies what df shows (beat selection and data version);
+        # a repeat view reuses the stored JSON instead of re-running plotly express.
+        def build():
+            fig = self.create_plotly_map(df, marker_size=marker_size)
+            return fig.to_json() if fig else None
+
+        payload = self._cached(("plotly", view_key, marker_size), build)
+        return pio.from_json(payload, skip_invalid=True) if payload else None
+
+    def folium_map_html(self, sorted_df, view_key):
+        def build():
+            return self.create_folium_map(sorted_df).get_root().render()
+
+        return self._cached(("folium", view_key, self.route_hash(sorted_df)), build)
+
+    def cluster_outlets(self, df, max_clusters=None):
+        max_clusters = max_clusters or self.MAX_CLUSTERS
+        beats = pd.Categorical(df["full_beat"].astype(str))
+        lat = df["lat"].to_numpy(dtype=np.float64)
+        lon = df["longi"].to_numpy(dtype=np.float64)
+
+        cell = self.CLUSTER_CELL_DEG
+        while True:
+            row = np.floor((lat - lat.min()) / cell).astype(np.int64)
+            col = np.floor((lon - lon.min()) / cell).astype(np.int64)
+            keys = (beats.codes.astype(np.int64) * (row.max() + 1) + row) * (col.max() + 1) + col
+            unique, inverse = np.unique(keys, return_inverse=True)
+            if len(unique) <= max_clusters or len(unique) <= len(beats.categories):
+                break
+            cell *= 2
+
+        counts = np.bincount(inverse)
+        first = np.zeros(len(unique), dtype=np.int64)
+        first[inverse[::-1]] = np.arange(len(inverse))[::-1]
+        return pd.DataFrame({
+            "full_beat": beats.categories[beats.codes[first]],
+            "lat": np.bincount(inverse, weights=lat) / counts,
+            "longi": np.bincount(inverse, weights=lon) / counts,
+            "outlets": counts,
+        })
+
+    def create_cluster_map(self, df):
+        clusters = self.cluster_outlets(df)
+        fig = px.scatter_mapbox(
+            clusters,
+            lat="lat",
+            lon="longi",
+            color="full_beat",
+            size="outlets",
+            size_max=24,
+            hover_name="full_beat",
+            hover_data={"outlets": True, "lat": False, "longi": False},
+            zoom=8,
+            center={"lat": df["lat"].mean(), "lon": df["longi"].mean()},
+            height=600,
+            opacity=0.7
+        )
+        fig.update_layout(
+            mapbox_style="carto-positron",
+            margin=dict(r=0, t=0, l=0, b=0),
+            hovermode="closest",
+            showlegend=True
+        )
+        return fig
+
     def create_plotly_map(self, df, marker_size=8):
         try:
             if df.empty:
                 return None
 
+            single_beat = "full_beat" not in df.columns or df["full_beat"].nunique() <= 1
+            if not single_beat or len(df) > self.MAX_POINTS:
+                return self.create_cluster_map(df)
+
             center_lat = df["lat"].mean()
             center_lon = df["longi"].mean()
 
             if "full_beat" in df.columns:
-                df["full_beat"] = df["full_beat"].astype(str)
+                df = df.assign(full_beat=df["full_beat"].astype(str))
 
             fig = px.scatter_mapbox(
                 df,
@@ -41,8 +138,59 @@ class MapGenerator:
         except Exception as e:
             raise MapError(f"Plotly map creation failed: {e}")
 
-    def create_folium_map(self, sorted_df):
+    def route_feature_collection(self, sorted_df):
+        n = len(sorted_df)
+        lat = sorted_df["lat"].to_numpy(dtype=float)
+        lon = sorted_df["longi"].to_numpy(dtype=float)
+        sequence = sorted_df["sequence"].astype(str)
+        names = sorted_df["outlet_name"].astype(str)
+        labels = (sequence + ". " + names).tolist()
+        popups = ("<b>" + sequence + ". " + names + "</b><br>Type: " + sorted_df["type_name"].astype(str)
+                  + f"<br>Total Outlets: {n}").tolist()
+        roles = np.full(n, "stop", dtype=object)
+        roles[-1] = "end"
+        roles[0] = "start"
+
+        features = [{
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": np.column_stack((lon, lat)).tolist()},
+            "properties": {"role": "route", "label": f"Route: {n} outlets", "popup": f"Total Outlets: {n}"},
+        }]
+        features += [
+            {"type": "Feature",
+             "geometry": {"type": "Point", "coordinates": [x, y]},
+             "properties": {"role": role, "label": label, "popup": popup}}
+            for x, y, role, label, popup in zip(lon.tolist(), lat.tolist(), roles, labels, popups)
+        ]
+        return {"type": "FeatureCollection", "features": features}
+
+    def _route_style(self, feature):
+        role = feature["properties"]["role"]
+        if role == "route":
+            return {"color": "#0066cc", "weight": 6, "dashArray": "10 20", "opacity": 0.8}
+        color = self.STOP_COLORS[role]
+        return {"color": "white", "weight": 1, "fillColor": color, "fillOpacity": 0.9}
+
+    def create_compact_folium_map(self, sorted_df):
+        center = [sorted_df["lat"].mean(), sorted_df["longi"].mean()]
+        m = folium.Map(location=center, zoom_start=12, tiles="OpenStreetMap")
+        folium.GeoJson(
+            self.route_feature_collection(sorted_df),
+            name="Route",
+            style_function=self._route_style,
+            marker=folium.CircleMarker(radius=7),
+            tooltip=folium.GeoJsonTooltip(fields=["label"], labels=False),
+            popup=folium.GeoJsonPopup(fields=["popup"], labels=False),
+        ).add_to(m)
+        return m
+
+    def create_folium_map(self, sorted_df, compact=None):
         try:
+            if compact is None:
+                compact = len(sorted_df) >= self.COMPACT_MIN_STOPS
+            if compact and len(sorted_df) > 1:
+                return self.create_compact_folium_map(sorted_df)
+
             if len(sorted_df) == 1:
                 center = [sorted_df["lat"].iloc[0], sorted_df["longi"].iloc[0]]
                 m = folium.Map(location=center, zoom_start=14, tiles="OpenStreetMap")
@@ -0,0 +1,289 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from exceptions import DataError
+from constants import EXPORT_DIR, EXPORT_PATTERN, OUTLET_STORE_FILE
+
+STORE_FORMAT = 3
+CHUNK_SIZE = 50_000
+CATEGORICAL_COLUMNS = ["full_beat", "district", "taluka", "type_name", "u_name"]
+INTEGER_COLUMNS = ["Unnamed: 0", "retailer_id", "outlet_type_id", "pin_code", "contact_no",
+                   "user_contact_no", "beat_number"]
+COORDINATE_COLUMNS = ["lat", "longi"]
+# (min, max) latitude and longitude accepted for an outlet; covers Karnataka.
+REGION_BOUNDS = ((11.5, 18.5), (74.0, 78.6))
+REJECT_REASONS = ["missing", "zero", "out_of_region", "duplicate"]
+METADATA_KEY = b"outlet_store"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class IngestReport:
+    rows_read: int = 0
+    rows_written: int = 0
+    rows_kept: int = 0
+    rows_updated: int = 0
+    chunks: int = 0
+    files: int = 0
+    rejected: dict = field(default_factory=lambda: dict.fromkeys(REJECT_REASONS, 0))
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_read / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def coordinate_rejections(lat, lon):
+    (min_lat, max_lat), (min_lon, max_lon) = REGION_BOUNDS
+    missing = lat.isna() | lon.isna()
+    zero = ~missing & ((lat == 0) | (lon == 0))
+    outside = ~missing & ~zero & ~(lat.between(min_lat, max_lat) & lon.between(min_lon, max_lon))
+    return {"missing": missing, "zero": zero, "out_of_region": outside}
+
+
+class _ChunkCleaner:
+    # Carries state across chunks: retailer ids already written and the
+    # category lists, which only ever grow so each batch's dictionary extends
+    # the previous one.
+    def __init__(self):
+        self.seen_ids = set()
+        self.categories = {col: {} for col in CATEGORICAL_COLUMNS}
+
+    def clean(self, chunk, report):
+        report.rows_read += len(chunk)
+        missing_cols = [col for col in COORDINATE_COLUMNS if col not in chunk.columns]
+        if missing_cols:
+            raise DataError(f"Missing coordinate columns: {', '.join(missing_cols)}")
+
+        for col in chunk.columns:
+            if col in COORDINATE_COLUMNS:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype(np.float64)
+            elif col in INTEGER_COLUMNS:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("Int64")
+            else:
+                chunk[col] = chunk[col].fillna("").astype(str).replace("nan", "")
+
+        keep = pd.Series(True, index=chunk.index)
+        for reason, rejected in coordinate_rejections(chunk["lat"], chunk["longi"]).items():
+            report.rejected[reason] += int(rejected.sum())
+            keep &= ~rejected
+        chunk = chunk[keep]
+
+        if "retailer_id" in chunk.columns:
+            ids = chunk["retailer_id"]
+            duplicate = ids.notna() & (ids.duplicated() | ids.isin(self.seen_ids))
+            report.rejected["duplicate"] += int(duplicate.sum())
+            chunk = chunk[~duplicate]
+            self.seen_ids.update(chunk["retailer_id"].dropna().tolist())
+
+        chunk = chunk.reset_index(drop=True)
+        chunk["outlet_id"] = chunk["outlet_name"] + "_" + chunk["lat"].astype(str) + "_" + chunk["longi"].astype(str)
+        report.rows_written += len(chunk)
+        return self.encode_categories(chunk)
+
+    def carry(self, chunk, report):
+        # Rows from the existing store were validated when first ingested; they
+        # are only dropped when a newer export has replaced the same retailer.
+        if "retailer_id" in chunk.columns:
+            ids = chunk["retailer_id"]
+            updated = ids.notna() & ids.isin(self.seen_ids)
+            report.rows_updated += int(updated.sum())
+            chunk = chunk[~updated].reset_index(drop=True)
+            self.seen_ids.update(chunk["retailer_id"].dropna().tolist())
+        for col in INTEGER_COLUMNS:
+            if col in chunk.columns:
+                chunk[col] = chunk[col].astype("Int64")
+        report.rows_kept += len(chunk)
+        report.rows_written += len(chunk)
+        return self.encode_categories(chunk)
+
+    def encode_categories(self, chunk):
+        for col in CATEGORICAL_COLUMNS:
+            if col in chunk.columns:
+                values = chunk[col].astype(str)
+                known = self.categories[col]
+                for value in values.unique():
+                    known.setdefault(value, len(known))
+                chunk[col] = pd.Categorical(values, categories=list(known))
+        return chunk
+
+
+def _arrow_schema(chunk):
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    # Fixed index width so a growing category list never changes the schema between batches.
+    for k, f in enumerate(schema):
+        if pa.types.is_dictionary(f.type):
+            schema = schema.set(k, pa.field(f.name, pa.dictionary(pa.int32(), pa.string())))
+    return schema
+
+
+def _align(chunk, schema):
+    # The newest export defines the columns; older exports get blanks for
+    # columns they lack and lose columns that were since dropped.
+    for name in schema.names:
+        if name not in chunk.columns:
+            arrow_type = schema.field(name).type
+            chunk[name] = pd.NA if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) else ""
+    return chunk[schema.names]
+
+
+def _string_types(arrow_type):
+    # Arrow-backed strings stay in the Arrow buffers instead of being copied
+    # into Python objects.
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+class OutletStore:
+    def __init__(self, source=EXPORT_DIR, path=OUTLET_STORE_FILE):
+        self.source = source
+        self.path = path
+
+    def source_files(self):
+        # Timestamped export names sort chronologically, oldest first.
+        if not os.path.isdir(self.source):
+            return [self.source]
+        files = sorted(glob.glob(os.path.join(self.source, EXPORT_PATTERN)))
+        if not files:
+            raise DataError(f"No exports matching {EXPORT_PATTERN} in {self.source}")
+        return files
+
+    def source_signature(self):
+        files = []
+        for path in self.source_files():
+            stat = os.stat(path)
+            files.append({"name": os.path.basename(path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+        return {"format": STORE_FORMAT, "files": files}
+
+    def source_version(self):
+        payload = json.dumps(self.source_signature(), sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def stored_signature(self):
+        try:
+            with pa.OSFile(self.path, "rb") as source:
+                schema = pa.ipc.open_file(source).schema
+        except (OSError, pa.ArrowInvalid):
+            return None
+        metadata = schema.metadata or {}
+        if METADATA_KEY not in metadata:
+            return None
+        return json.loads(metadata[METADATA_KEY])
+
+    def _stored_files(self, current):
+        # Number of leading source files already in the store, each with the
+        # stored sha256 carried over. A touched but otherwise identical export
+        # (e.g. re-copied) still counts as stored.
+        stored = self.stored_signature()
+        if stored is None or stored.get("format") != STORE_FORMAT:
+            return 0, current
+        files = [dict(f) for f in current]
+        count = 0
+        for entry, stored_entry in zip(files, stored["files"]):
+            if entry["name"] != stored_entry["name"]:
+                break
+            same_stat = entry["mtime_ns"] == stored_entry["mtime_ns"] and entry["size"] == stored_entry["size"]
+            if not same_stat and file_digest(os.path.join(self._source_dir(), entry["name"])) != stored_entry["sha256"]:
+                break
+            entry["sha256"] = stored_entry["sha256"]
+            count += 1
+        if count < len(stored["files"]):
+            # An export already in the store changed or disappeared.
+            return 0, current
+        return count, files
+
+    def _source_dir(self):
+        return self.source if os.path.isdir(self.source) else os.path.dirname(self.source)
+
+    def is_fresh(self):
+        current = self.source_signature()["files"]
+        stored_count, _ = self._stored_files(current)
+        return stored_count == len(current)
+
+    def build(self, chunk_size=CHUNK_SIZE, progress=None, incremental=True):
+        # Streams the CSVs chunk by chunk, so peak memory is bounded by the chunk
+        # size, the retailer ids seen so far and the category lists. Exports are
+        # read newest first, so the latest row for a retailer wins. When only new
+        # exports were added, they are merged in front of the existing store
+        # instead of re-reading every older export.
+        report = IngestReport()
+        start = time.perf_counter()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            signature = self.source_signature()
+            stored_count, signature["files"] = self._stored_files(signature["files"])
+            if not incremental:
+                stored_count = 0
+            new_files = signature["files"][stored_count:]
+            for entry in new_files:
+                entry["sha256"] = file_digest(os.path.join(self._source_dir(), entry["name"]))
+
+            cleaner = _ChunkCleaner()
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            writer = None
+            schema = None
+
+            def write(chunk):
+                nonlocal writer, schema
+                if writer is None:
+                    schema = _arrow_schema(chunk).with_metadata(
+                        {METADATA_KEY: json.dumps(signature).encode()})
+                    writer = pa.ipc.new_file(sink, schema, options=options)
+                writer.write_table(pa.Table.from_pandas(_align(chunk, schema), schema=schema,
+                                                        preserve_index=False))
+                report.chunks += 1
+                report.elapsed = time.perf_counter() - start
+                if progress is not None:
+                    progress(report)
+
+            with pa.OSFile(tmp_path, "wb") as sink:
+                for entry in reversed(new_files):
+                    path = os.path.join(self._source_dir(), entry["name"])
+                    for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_size):
+                        write(cleaner.clean(chunk, report))
+                    report.files += 1
+                if stored_count:
+                    for batch in self._stored_table().to_batches(max_chunksize=chunk_size):
+                        chunk = batch.to_pandas(ignore_metadata=True, types_mapper=_string_types)
+                        write(cleaner.carry(chunk, report))
+                if writer is None:
+                    raise DataError("No rows found")
+                writer.close()
+            # Written next to the target and swapped in, so readers never see a partial file.
+            os.replace(tmp_path, self.path)
+            report.elapsed = time.perf_counter() - start
+            return report
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise DataError(f"Outlet store build failed: {e}")
+
+    def _stored_table(self):
+        # Read into memory rather than memory-mapped: a mapped file cannot be
+        # replaced on Windows, and the loaded frame outlives the next rebuild.
+        with pa.OSFile(self.path, "rb") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def load(self):
+        if not self.is_fresh():
+            self.build()
+        try:
+            # ignore_metadata: integer columns without gaps come back as plain int64.
+            return self._stored_table().to_pandas(split_blocks=True, ignore_metadata=True,
+                                                  types_mapper=_string_types)
+        except Exception as e:
+            raise DataError(f"Outlet store read failed: {e}")
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from data_loader import DataLoader
+from outlet_store import OutletStore
+from route_cache import RouteCache
+from route_optimizer import RouteOptimizer
+from constants import EXPORT_DIR, OUTLET_STORE_FILE, ROUTE_CACHE_FILE
+
+
+def optimize_beat(coords, solver_options, previous=None):
+    start = time.perf_counter()
+    result = RouteOptimizer().solve(coords, previous=previous, **solver_options)
+    return asdict(result), time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Precompute optimized routes for every beat into the shared route cache."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--beats", nargs="+", help="only these beats (default: all)")
+    parser.add_argument("--solver", default="auto", choices=["auto"] + sorted(RouteOptimizer.SOLVERS))
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="per-beat solver time budget in seconds")
+    parser.add_argument("--cache", default=ROUTE_CACHE_FILE, help="route cache database")
+    parser.add_argument("--source", default=EXPORT_DIR, help="outlet export CSV or directory of exports")
+    parser.add_argument("--store", default=OUTLET_STORE_FILE, help="compiled outlet store")
+    parser.add_argument("--force", action="store_true",
+                        help="recompute beats that are already cached, with a full search")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    route_cache = RouteCache(args.cache)
+    optimizer = RouteOptimizer(route_cache=route_cache)
+    # Loading syncs the route cache: beats whose outlet sets changed lose their
+    # routes and are picked up below, unchanged beats stay cached.
+    df = DataLoader(route_cache=route_cache, outlet_store=OutletStore(args.source, args.store)).load_data()
+
+    beats = df.groupby("full_beat", sort=True, observed=True)
+    if args.beats:
+        missing = set(args.beats) - set(beats.groups)
+        if missing:
+            print(f"Unknown beats: {', '.join(sorted(missing))}", file=sys.stderr)
+            return 1
+
+    solver_options = {"solver": args.solver, "time_limit": args.time_limit}
+    jobs = []
+    cached = 0
+    for beat, group in beats:
+        if args.beats and beat not in args.beats:
+            continue
+        coords = group[["lat", "longi"]].values
+        params = optimizer.cache_params(len(coords), **solver_options)
+        if not args.force and optimizer.cached_result(coords, **solver_options) is not None:
+            cached += 1
+            continue
+        # With solver auto, edited beats start from their last route unless a
+        # full search is forced.
+        previous = None if args.force else route_cache.get_beat_route(beat)
+        jobs.append((beat, coords, params, previous))
+
+    print(f"Optimizing {len(jobs)} beats with {args.workers} workers "
+          f"({cached} already cached)")
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(optimize_beat, coords, solver_options, previous): (beat, coords, params)
+                   for beat, coords, params, previous in jobs}
+        for future in as_completed(futures):
+            beat, coords, params = futures[future]
+            try:
+                result, elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"  {beat:<20} FAILED: {e}", file=sys.stderr)
+                continue
+            route_cache.put(coords, dict(params, solver=result["solver"]), result)
+            route_cache.put_beat_route(beat, coords[result["route"]])
+            print(f"  {beat:<20} {len(coords):>5} outlets {elapsed:>7.2f}s "
+                  f"{result['distance']:>9.2f} km  {result['solver']} ({result['stop_reason']})")
+
+    wall = time.perf_counter() - start
+    done = len(jobs) - failures
+    throughput = done / wall if wall > 0 else 0.0
+    print(f"Done: {done} beats in {wall:.2f}s ({throughput:.2f} beats/sec), {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
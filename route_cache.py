@@ -0,0 +1,156 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+import numpy as np
+from exceptions import RouteOptimizationError
+from constants import ROUTE_CACHE_FILE
+
+COORD_DECIMALS = 7
+
+
+def canonical_order(coords):
+    # Rows sorted by (lat, lon) give the same outlet set the same layout no
+    # matter how the beat's rows happen to be ordered in the CSV.
+    rounded = np.round(np.asarray(coords, dtype=np.float64), COORD_DECIMALS)
+    order = np.lexsort((rounded[:, 1], rounded[:, 0]))
+    digest = hashlib.sha256(np.ascontiguousarray(rounded[order]).tobytes()).hexdigest()
+    return order, digest
+
+
+def coords_hash(coords):
+    return canonical_order(coords)[1]
+
+
+class RouteCache:
+    def __init__(self, path=ROUTE_CACHE_FILE, max_entries=5000, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS routes ("
+                "key TEXT PRIMARY KEY, coords_hash TEXT NOT NULL, result TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS routes_coords_hash ON routes (coords_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS routes_last_used ON routes (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS beat_routes ("
+                "beat TEXT PRIMARY KEY, stops TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(beat_hash, params):
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(f"{beat_hash}:{payload}".encode()).hexdigest()
+
+    def get(self, coords, params):
+        try:
+            order, beat_hash = canonical_order(coords)
+            key = self.make_key(beat_hash, params)
+            with self._connect() as conn:
+                row = conn.execute("SELECT result FROM routes WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE routes SET last_used = ? WHERE key = ?", (time.time(), key))
+            result = json.loads(row[0])
+            result["route"] = order[result["route"]].tolist()
+            return result
+        except sqlite3.Error as e:
+            raise RouteOptimizationError(f"Route cache read failed: {e}")
+
+    def put(self, coords, params, result):
+        try:
+            order, beat_hash = canonical_order(coords)
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            stored = dict(result, route=inverse[np.asarray(result["route"], dtype=int)].tolist())
+            payload = json.dumps(stored)
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.make_key(beat_hash, params), beat_hash, payload, len(payload), now, now),
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            raise RouteOptimizationError(f"Route cache write failed: {e}")
+
+    def _evict(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM routes").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        excess_rows = max(0, count - self.max_entries)
+        excess_bytes = max(0, total - self.max_bytes)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM routes ORDER BY last_used"):
+            if excess_rows <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_rows -= 1
+            excess_bytes -= size
+        conn.executemany("DELETE FROM routes WHERE key = ?", victims)
+
+    def sync_data_version(self, data_version, beat_hashes):
+        # Called when the outlet data changes: routes for outlet sets that no
+        # longer exist are dropped, unchanged beats keep their cached routes.
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM meta WHERE name = 'data_version'").fetchone()
+                if row is not None and row[0] == data_version:
+                    return 0
+                conn.execute("CREATE TEMP TABLE live_hashes (coords_hash TEXT PRIMARY KEY)")
+                conn.executemany("INSERT OR IGNORE INTO live_hashes VALUES (?)",
+                                 [(h,) for h in beat_hashes])
+                removed = conn.execute(
+                    "DELETE FROM routes WHERE coords_hash NOT IN (SELECT coords_hash FROM live_hashes)"
+                ).rowcount
+                conn.execute("DROP TABLE live_hashes")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('data_version', ?)", (data_version,))
+                return removed
+        except sqlite3.Error as e:
+            raise RouteOptimizationError(f"Route cache invalidation failed: {e}")
+
+    def get_beat_route(self, beat):
+        # Coordinates of the beat's last optimized route, in visit order. Kept
+        # across data changes so an edited beat can start from its old route.
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT stops FROM beat_routes WHERE beat = ?", (beat,)).fetchone()
+            return None if row is None else np.asarray(json.loads(row[0]), dtype=np.float64)
+        except sqlite3.Error as e:
+            raise RouteOptimizationError(f"Route cache read failed: {e}")
+
+    def put_beat_route(self, beat, stops):
+        try:
+            payload = json.dumps(np.round(np.asarray(stops, dtype=np.float64), COORD_DECIMALS).tolist())
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO beat_routes VALUES (?, ?, ?)",
+                             (beat, payload, time.time()))
+        except sqlite3.Error as e:
+            raise RouteOptimizationError(f"Route cache write failed: {e}")
+
+    def rename_beat(self, old_name, new_name):
+        try:
+            with self._connect() as conn:
+                conn.execute("UPDATE OR REPLACE beat_routes SET beat = ? WHERE beat = ?", (new_name, old_name))
+        except sqlite3.Error as e:
+            raise RouteOptimizationError(f"Route cache write failed: {e}")
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM routes")
+            conn.execute("DELETE FROM beat_routes")
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import time
+import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from exceptions import RouteOptimizationError, RouteQueueFullError
+from route_cache import RouteCache
+
+
+@dataclass
+class RouteJob:
+    job_id: str
+    key: str = None
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    fraction: float = 0.0
+    best_distance: float = None
+    result: object = None
+    error: str = None
+    requests: int = 1
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def waited(self):
+        return (self.started_at or time.time()) - self.submitted_at
+
+    def get(self):
+        if self.status == "failed":
+            raise RouteOptimizationError(self.error)
+        return self.result
+
+    def snapshot(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "elapsed": self.elapsed,
+            "waited": self.waited,
+            "fraction": self.fraction,
+            "best_distance": self.best_distance,
+            "requests": self.requests,
+        }
+
+
+class RouteJobManager:
+    # Runs RouteOptimizer.solve on a shared thread pool so a page can render
+    # straight away and pick the route up on a later rerun. Requests for the
+    # same outlet set and solver options share one in-flight job, at most
+    # max_workers searches run at once, and at most max_queued wait behind them.
+    def __init__(self, optimizer, max_workers=2, max_queued=16, keep_finished=600.0):
+        self.optimizer = optimizer
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="route-job")
+        self._jobs = {}
+        self._inflight = {}
+        self._queued = 0
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.rejected = 0
+
+    def job_key(self, coords, **solver_options):
+        # Row order is part of the key: a job's route indexes into the coords it
+        # was given, so only requests with identical rows can share it.
+        params = self.optimizer.cache_params(len(coords), **solver_options)
+        coords = np.ascontiguousarray(coords, dtype=np.float64)
+        return RouteCache.make_key(hashlib.sha256(coords.tobytes()).hexdigest(), params)
+
+    def submit(self, coords, beat=None, **solver_options):
+        cached = self.optimizer.cached_result(coords, **solver_options)
+        key = self.job_key(coords, **solver_options)
+        with self._lock:
+            self._prune()
+            if cached is None:
+                inflight = self._inflight.get(key)
+                if inflight is not None:
+                    inflight.requests += 1
+                    self.coalesced += 1
+                    return inflight
+                if self._queued >= self.max_queued:
+                    self.rejected += 1
+                    raise RouteQueueFullError(
+                        f"Route optimization queue is full ({self._queued} beats waiting)")
+            job = RouteJob(uuid.uuid4().hex, key)
+            if cached is not None:
+                # Cached routes are ready now; no need to queue behind running searches.
+                job.started_at = job.finished_at = job.submitted_at
+                job.status, job.fraction, job.result, job.best_distance = "done", 1.0, cached, cached.distance
+            else:
+                self._inflight[key] = job
+                self._queued += 1
+            self._jobs[job.job_id] = job
+        if not job.done:
+            self._executor.submit(self._run, job, coords, beat, solver_options)
+        return job
+
+    def _run(self, job, coords, beat, solver_options):
+        with self._lock:
+            self._queued -= 1
+        job.started_at = time.time()
+        job.status = "running"
+
+        def progress(fraction, best_distance):
+            job.fraction = fraction
+            if best_distance is not None:
+                job.best_distance = best_distance
+
+        # Status is set last: other threads read done as "result, error and
+        # finished_at are all in place".
+        try:
+            job.result = self.optimizer.solve(coords, progress=progress, beat=beat, **solver_options)
+            job.best_distance = job.result.distance
+            status = "done"
+        except Exception as e:
+            job.error = str(e)
+            status = "failed"
+        job.finished_at = time.time()
+        job.status = status
+        with self._lock:
+            self._inflight.pop(job.key, None)
+
+    def job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        job = self.job(job_id)
+        return job.snapshot() if job is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": len(self._inflight) - self._queued,
+                "queued": self._queued,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+            }
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_finished
+        for job_id in [j for j, job in self._jobs.items() if job.done and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -1,87 +1,391 @@
 import numpy as np
-import random
-import streamlit as st
-from scipy.spatial import distance_matrix
-from geopy.distance import geodesic
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from exceptions import RouteOptimizationError  # Fixed import
+from geo import distance_matrix_km, leg_distances
+from held_karp import held_karp_bound, held_karp_path
+from genetic import Population, evolve_island, ga_parameters, init_island_worker, migrate
+from local_search import (TwoOptEngine, OrOptEngine, cheapest_insertion, double_bridge,
+                          nearest_neighbor_route, path_length)
+from route_cache import COORD_DECIMALS, coords_hash
+
+@dataclass
+class RouteResult:
+    route: list
+    distance: float
+    solver: str
+    stop_reason: str
+    iterations: int = 0
+    elapsed: float = 0.0
+    lower_bound: float = 0.0
+    cached: bool = False
+
+    @property
+    def gap(self):
+        if self.lower_bound <= 0:
+            return 0.0
+        return max(0.0, self.distance / self.lower_bound - 1.0)
+
+
+class SearchBudget:
+    def __init__(self, time_limit, max_iterations=None, stall_limit=None, progress=None):
+        self.start = time.perf_counter()
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.stall_limit = stall_limit
+        self.progress = progress
+        self.iterations = 0
+        self.stalled = 0
+        self.stop_reason = "converged"
+        # Search stops once the best route is within target km (set from the
+        # lower bound), since it can then be at most that far from optimal.
+        self.target = None
+        self.best_distance = None
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def fraction_used(self):
+        fractions = [self.elapsed / self.time_limit if self.time_limit else 0.0]
+        if self.max_iterations:
+            fractions.append(self.iterations / self.max_iterations)
+        return min(1.0, max(fractions))
+
+    def record(self, improved, best_distance=None):
+        self.iterations += 1
+        self.stalled = 0 if improved else self.stalled + 1
+        if best_distance is not None:
+            self.best_distance = best_distance
+        if self.progress is not None:
+            self.progress(self.fraction_used(), best_distance)
+
+    def exhausted(self):
+        if self.target is not None and self.best_distance is not None and self.best_distance <= self.target:
+            self.stop_reason = "bound"
+        elif self.time_limit is not None and self.elapsed >= self.time_limit:
+            self.stop_reason = "deadline"
+        elif self.max_iterations is not None and self.iterations >= self.max_iterations:
+            self.stop_reason = "iterations"
+        elif self.stall_limit is not None and self.stalled >= self.stall_limit:
+            self.stop_reason = "stalled"
+        else:
+            return False
+        return True
+
 
 class RouteOptimizer:
-    def two_opt_improved(self, route, dist_matrix):
-        best = route.copy()
-        improved = True
-        while improved:
-            improved = False
-            for i in range(1, len(route) - 2):
-                for j in range(i + 2, min(len(route), i + 15)):
-                    a, b, c, d = best[i - 1], best[i], best[j - 1], best[j % len(best)]
-                    current = dist_matrix[a, b] + dist_matrix[c, d]
-                    potential = dist_matrix[a, c] + dist_matrix[b, d]
-                    if potential < current:
-                        best[i:j] = best[i:j][::-1]
-                        improved = True
-        return best
+    DEFAULT_TIME_LIMIT = 2.0
+    DEFAULT_STALL_LIMIT = 100
+    LK_MAX_SIZE = 500
+    # auto solves beats up to this size exactly; held_karp refuses beats above
+    # HELD_KARP_LIMIT (its table grows as 2^n).
+    HELD_KARP_MAX_SIZE = 12
+    HELD_KARP_LIMIT = 16
+    # Iterative solvers get the bound up front, tightened for up to a share of
+    # the time budget, and stop within BOUND_GAP of it. The others only report
+    # it, so they get a few subgradient iterations after the search, and warm
+    # starts the plain MST bound (one iteration).
+    ITERATIVE_SOLVERS = ("lk", "ga", "ga_islands")
+    BOUND_TIME_FRACTION = 0.25
+    BOUND_GAP = 0.005
+    QUICK_BOUND_ITERATIONS = 10
+    WARM_START_BOUND_ITERATIONS = 1
+    NN_STARTS = 10
+    ISLANDS = 4
+    MIGRATION_INTERVAL = 10
+    MIGRANTS = 2
+    # Share of the current outlets that must already be on the previous route
+    # for a warm start; bigger edits get a full search.
+    WARM_START_MIN_OVERLAP = 0.5
+
+    def __init__(self, route_cache=None, workers=1, seed=None):
+        self.route_cache = route_cache
+        self.workers = max(1, workers or 1)
+        self.seed = seed
+
+    def two_opt_improved(self, route, dist_matrix, mode="auto", backend="auto"):
+        return TwoOptEngine(dist_matrix, mode=mode, backend=backend).improve(route)
 
     def route_distance(self, route, dist_matrix):
-        total = 0.0
-        for i in range(len(route) - 1):
-            total += dist_matrix[route[i], route[i+1]]
-        return total
+        return path_length(route, dist_matrix)
+
+    def select_solver(self, n):
+        if n <= self.HELD_KARP_MAX_SIZE:
+            return "held_karp"
+        return "lk" if n <= self.LK_MAX_SIZE else "or_3opt"
+
+    @classmethod
+    def register_solver(cls, name, solver):
+        cls.SOLVERS = {**cls.SOLVERS, name: solver}
+
+    def lower_bound(self, dist_matrix, upper_bound=None, time_limit=None, iterations=100):
+        # Held-Karp (1-tree) bound; at worst the MST bound. upper_bound, any
+        # route's length, scales the subgradient steps.
+        if upper_bound is None:
+            upper_bound = path_length(nearest_neighbor_route(dist_matrix, [0]), dist_matrix)
+        return held_karp_bound(dist_matrix, upper_bound, iterations=iterations, time_limit=time_limit)
+
+    def _nn_start(self, dist_matrix, budget=None):
+        n = len(dist_matrix)
+        starts = np.linspace(0, n - 1, min(n, self.NN_STARTS)).astype(int)
+        return nearest_neighbor_route(dist_matrix, starts, budget)
+
+    def _local_search(self, route, dist_matrix, two_opt, or_opt, budget=None):
+        # With a budget, the descent stops between passes once it is exhausted.
+        best_length = path_length(route, dist_matrix)
+        while True:
+            route = or_opt.improve(two_opt.improve(route, budget), budget)
+            length = path_length(route, dist_matrix)
+            if length >= best_length - 1e-12 or (budget is not None and budget.exhausted()):
+                return route
+            best_length = length
+
+    def warm_start_route(self, coords, previous, dist_matrix):
+        # Previous route (as visit-ordered coordinates) minus outlets that are
+        # gone, plus new outlets by cheapest insertion, then one local search.
+        # None when too little of the beat carried over.
+        positions = {}
+        for i, point in enumerate(np.round(np.asarray(coords, dtype=np.float64), COORD_DECIMALS).tolist()):
+            positions.setdefault(tuple(point), []).append(i)
+        kept = []
+        for point in np.round(np.asarray(previous, dtype=np.float64), COORD_DECIMALS).tolist():
+            matches = positions.get(tuple(point))
+            if matches:
+                kept.append(matches.pop())
+        n = len(coords)
+        if len(kept) < max(2, self.WARM_START_MIN_OVERLAP * n):
+            return None
+        added = [i for matches in positions.values() for i in matches]
+        route = cheapest_insertion(kept, added, dist_matrix)
+        return self._local_search(route, dist_matrix, TwoOptEngine(dist_matrix, mode="neighbors"),
+                                  OrOptEngine(dist_matrix, allow_reverse=True))
+
+    def _solve_held_karp(self, dist_matrix, budget):
+        if len(dist_matrix) > self.HELD_KARP_LIMIT:
+            raise RouteOptimizationError(
+                f"held_karp is limited to {self.HELD_KARP_LIMIT} outlets, got {len(dist_matrix)}")
+        return held_karp_path(dist_matrix)
+
+    def _solve_nn_2opt(self, dist_matrix, budget):
+        return TwoOptEngine(dist_matrix).improve(self._nn_start(dist_matrix, budget), budget)
+
+    def _solve_or_opt(self, dist_matrix, budget):
+        route = self._solve_nn_2opt(dist_matrix, budget)
+        if budget.exhausted():
+            return route
+        return OrOptEngine(dist_matrix).improve(route, budget)
 
-    @st.cache_data(show_spinner=True, max_entries=20)
-    def optimize_single_beat(_self, coords):
+    def _solve_or_3opt(self, dist_matrix, budget):
+        two_opt = TwoOptEngine(dist_matrix)
+        or_opt = OrOptEngine(dist_matrix, allow_reverse=True)
+        return self._local_search(self._nn_start(dist_matrix, budget), dist_matrix, two_opt, or_opt, budget)
+
+    def _solve_lk(self, dist_matrix, budget):
+        # Chained local search in the spirit of LKH: 2-opt + or-3opt moves on
+        # neighbour lists, perturbed with double-bridge kicks between descents.
+        budget.max_iterations = budget.max_iterations or 50 * len(dist_matrix)
+        rng = np.random.default_rng(self.seed)
+        two_opt = TwoOptEngine(dist_matrix, mode="neighbors")
+        or_opt = OrOptEngine(dist_matrix, allow_reverse=True)
+
+        best = self._local_search(self._nn_start(dist_matrix, budget), dist_matrix, two_opt, or_opt, budget)
+        best_length = path_length(best, dist_matrix)
+        while not budget.exhausted():
+            candidate = self._local_search(double_bridge(best, rng), dist_matrix, two_opt, or_opt, budget)
+            length = path_length(candidate, dist_matrix)
+            improved = length < best_length - 1e-12
+            if improved:
+                best, best_length = candidate, length
+            budget.record(improved, best_length)
+        return best
+
+    def _solve_ga(self, dist_matrix, budget):
+        n = len(dist_matrix)
+        population_size, generations, mutation_rate = ga_parameters(n)
+        budget.max_iterations = budget.max_iterations or generations
+        rng = np.random.default_rng(self.seed)
+        two_opt = TwoOptEngine(dist_matrix)
+
+        population = Population.random(n, population_size, two_opt, rng, dist_matrix)
+        best_length = population.lengths.min()
+
+        while not budget.exhausted():
+            population.next_generation(two_opt, rng, mutation_rate)
+            length = population.lengths.min()
+            improved = length < best_length - 1e-12
+            best_length = min(best_length, length)
+            budget.record(improved, best_length)
+
+        return population.best()[0]
+
+    def _solve_ga_islands(self, dist_matrix, budget):
+        # Island model: sub-populations evolve independently for
+        # MIGRATION_INTERVAL generations, then swap elites around a ring.
+        # One budget iteration is one epoch. With a fixed seed and no deadline
+        # the result does not depend on the worker count.
+        n = len(dist_matrix)
+        population_size, generations, mutation_rate = ga_parameters(n)
+        interval = self.MIGRATION_INTERVAL
+        islands_count = self.ISLANDS
+        island_size = max(2 * self.MIGRANTS + 10, population_size // islands_count)
+        budget.max_iterations = -(-(budget.max_iterations or generations) // interval)
+        if budget.stall_limit is not None:
+            budget.stall_limit = max(1, budget.stall_limit // interval)
+
+        seeds = np.random.SeedSequence(self.seed)
+        rng = np.random.default_rng(seeds.spawn(1)[0])
+        two_opt = TwoOptEngine(dist_matrix)
+        islands = [Population.random(n, island_size, two_opt, rng, dist_matrix)
+                   for _ in range(islands_count)]
+        best_length = min(island.lengths.min() for island in islands)
+
+        deadline = None
+        if budget.time_limit is not None:
+            deadline = time.time() + budget.time_limit - budget.elapsed
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=min(self.workers, islands_count), initializer=init_island_worker,
+                                       initargs=(dist_matrix,))
+        try:
+            while not budget.exhausted():
+                epoch_seeds = seeds.spawn(islands_count)
+                if pool is None:
+                    islands = [evolve_island(island, interval, seed, mutation_rate, deadline, two_opt)
+                               for island, seed in zip(islands, epoch_seeds)]
+                else:
+                    islands = [island.attach(dist_matrix) for island in
+                               pool.map(evolve_island, islands, [interval] * islands_count,
+                                        epoch_seeds, [mutation_rate] * islands_count,
+                                        [deadline] * islands_count)]
+                length = min(island.lengths.min() for island in islands)
+                improved = length < best_length - 1e-12
+                best_length = min(best_length, length)
+                budget.record(improved, best_length)
+                islands = migrate(islands, self.MIGRANTS)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        return min((island.best() for island in islands), key=lambda best: best[1])[0]
+
+    SOLVERS = {
+        "held_karp": _solve_held_karp,
+        "nn_2opt": _solve_nn_2opt,
+        "or_opt": _solve_or_opt,
+        "or_3opt": _solve_or_3opt,
+        "lk": _solve_lk,
+        "ga": _solve_ga,
+        "ga_islands": _solve_ga_islands,
+    }
+
+    def cache_params(self, n, solver="auto", time_limit=None, max_iterations=None,
+                     stall_limit=None, metric="haversine", dtype="float64"):
+        return {
+            "solver": self.select_solver(n) if solver == "auto" else solver,
+            "time_limit": time_limit, "max_iterations": max_iterations,
+            "stall_limit": stall_limit, "metric": metric, "dtype": dtype,
+        }
+
+    def cached_result(self, coords, solver="auto", time_limit=None, max_iterations=None,
+                      stall_limit=None, metric="haversine", dtype="float64"):
+        # The answer solve() would return without searching, or None.
+        n = len(coords)
+        if n < 3:
+            # One order only; with two outlets its single leg is also the bound.
+            distance = float(distance_matrix_km(coords, metric=metric, dtype=dtype)[0, 1]) if n == 2 else 0.0
+            return RouteResult(list(range(n)), distance, "trivial", "converged", lower_bound=distance)
+        if self.route_cache is not None:
+            params = self.cache_params(n, solver, time_limit, max_iterations, stall_limit, metric, dtype)
+            candidates = [params]
+            if solver == "auto":
+                # auto also accepts a route repaired by a warm start.
+                candidates.append(dict(params, solver="warm_start"))
+            for candidate in candidates:
+                cached = self.route_cache.get(coords, candidate)
+                if cached is not None:
+                    return RouteResult(**dict(cached, cached=True))
+        return None
+
+    def solve(self, coords, solver="auto", time_limit=None, max_iterations=None,
+              stall_limit=None, metric="haversine", dtype="float64", progress=None,
+              beat=None, previous=None):
+        # beat names the outlet set across edits: with solver "auto", when the
+        # beat's last route covers a different but mostly shared outlet set,
+        # that route is repaired instead of searched from scratch. previous
+        # passes the last route in directly.
         try:
             n = len(coords)
-            if n < 2:
-                return list(range(n))
-
-            dist_matrix = distance_matrix(coords, coords)
-            
-            population_size = min(200, max(50, n * 2))
-            generations = min(1000, max(100, n * 5))
-            mutation_rate = max(0.01, min(0.1, 0.5 / n))
-
-            def create_individual():
-                individual = np.random.permutation(n)
-                return _self.two_opt_improved(individual, dist_matrix)
-
-            population = [create_individual() for _ in range(population_size)]
-            progress_bar = st.progress(0)
-
-            for gen in range(generations):
-                population = sorted(population, key=lambda x: _self.route_distance(x, dist_matrix))
-                next_gen = population[:10]
-                
-                while len(next_gen) < population_size:
-                    p1, p2 = random.choices(population[:50], k=2)
-                    a, b = sorted(random.sample(range(n), 2))
-                    child = np.concatenate([
-                        p2[~np.isin(p2, p1[a:b])],
-                        p1[a:b]
-                    ])
-                    
-                    if random.random() < mutation_rate:
-                        i, j = random.sample(range(n), 2)
-                        child[i], child[j] = child[j], child[i]
-                    
-                    child = _self.two_opt_improved(child, dist_matrix)
-                    next_gen.append(child)
-                
-                population = next_gen
-                progress_bar.progress((gen + 1) / generations)
-
-            progress_bar.empty()
-            return min(population, key=lambda x: _self.route_distance(x, dist_matrix))
-            
+            requested = solver
+            params = self.cache_params(n, solver, time_limit, max_iterations, stall_limit, metric, dtype)
+            solver = params["solver"]
+            if n >= 3 and solver not in self.SOLVERS:
+                raise RouteOptimizationError(f"Unknown solver: {solver}")
+
+            cached = self.cached_result(coords, requested, time_limit, max_iterations, stall_limit, metric, dtype)
+            if cached is not None:
+                return cached
+
+            budget = SearchBudget(
+                self.DEFAULT_TIME_LIMIT if time_limit is None else time_limit,
+                max_iterations,
+                self.DEFAULT_STALL_LIMIT if stall_limit is None else stall_limit,
+                progress,
+            )
+            dist_matrix = distance_matrix_km(coords, metric=metric, dtype=dtype)
+            warm = requested == "auto" and solver != "held_karp"
+            if warm and previous is None and beat is not None and self.route_cache is not None:
+                previous = self.route_cache.get_beat_route(beat)
+            route = None
+            if warm and previous is not None and coords_hash(previous) != coords_hash(coords):
+                route = self.warm_start_route(coords, previous, dist_matrix)
+            if route is not None:
+                used = "warm_start"
+                bound = self.lower_bound(dist_matrix, path_length(route, dist_matrix),
+                                         iterations=self.WARM_START_BOUND_ITERATIONS)
+            elif solver == "held_karp":
+                used = solver
+                route = self.SOLVERS[solver](self, dist_matrix, budget)
+                bound = path_length(route, dist_matrix)
+            elif solver in self.ITERATIVE_SOLVERS:
+                used = solver
+                bound = self.lower_bound(dist_matrix, time_limit=self.BOUND_TIME_FRACTION * budget.time_limit)
+                budget.target = bound * (1 + self.BOUND_GAP)
+                route = self.SOLVERS[solver](self, dist_matrix, budget)
+            else:
+                used = solver
+                route = self.SOLVERS[solver](self, dist_matrix, budget)
+                bound = self.lower_bound(dist_matrix, path_length(route, dist_matrix),
+                                         iterations=self.QUICK_BOUND_ITERATIONS)
+            result = RouteResult(
+                route=[int(i) for i in route],
+                distance=path_length(route, dist_matrix),
+                solver=used,
+                stop_reason=budget.stop_reason,
+                iterations=budget.iterations,
+                elapsed=budget.elapsed,
+                lower_bound=bound,
+            )
+            if self.route_cache is not None:
+                # Filed under the solver that ran, so a warm start never stands
+                # in for an explicitly requested solver.
+                self.route_cache.put(coords, dict(params, solver=used), asdict(result))
+                if beat is not None:
+                    self.route_cache.put_beat_route(beat, np.asarray(coords)[result.route])
+            if progress is not None:
+                progress(1.0, result.distance)
+            return result
+
         except Exception as e:
             raise RouteOptimizationError(f"Route optimization failed: {e}")
 
-    def calculate_route_distance(self, sorted_df):
+    def route_leg_distances(self, sorted_df, exact=False):
         try:
-            total_distance = 0
-            for i in range(1, len(sorted_df)):
-                point1 = (sorted_df.iloc[i-1]["lat"], sorted_df.iloc[i-1]["longi"])
-                point2 = (sorted_df.iloc[i]["lat"], sorted_df.iloc[i]["longi"])
-                total_distance += geodesic(point1, point2).km
-            return total_distance
+            return leg_distances(sorted_df["lat"].to_numpy(), sorted_df["longi"].to_numpy(), exact=exact)
         except Exception as e:
-            raise RouteOptimizationError(f"Distance calculation failed: {e}")
\ No newline at end of file
+            raise RouteOptimizationError(f"Distance calculation failed: {e}")
+
+    def calculate_route_distance(self, sorted_df, exact=False):
+        _, cumulative = self.route_leg_distances(sorted_df, exact=exact)
+        return float(cumulative[-1]) if len(cumulative) else 0.0
@@ -0,0 +1,46 @@
+import time
+import streamlit as st
+from route_cache import RouteCache
+from exceptions import RouteQueueFullError
+from route_jobs import RouteJob, RouteJobManager
+from route_optimizer import RouteOptimizer
+
+
+@st.cache_resource(show_spinner=False)
+def shared_route_jobs():
+    # One pool of optimization threads for every session of the app.
+    return RouteJobManager(RouteOptimizer(route_cache=RouteCache()))
+
+
+class StreamlitRouteOptimizer(RouteOptimizer):
+    POLL_INTERVAL = 0.75
+
+    def __init__(self, route_cache=None, workers=1, seed=None, route_jobs=None):
+        super().__init__(route_cache, workers, seed)
+        self.route_jobs = route_jobs
+        self.pending = False
+
+    def optimize_in_background(self, coords, beat=None, **solver_options):
+        # The session keeps one job id per coords array and solver options, so
+        # reruns poll the same job; a job that was pruned is simply resubmitted.
+        # The key keeps row order: the route indexes into these exact rows.
+        session_key = "route_job:" + self.route_jobs.job_key(coords, **solver_options)
+        job = self.route_jobs.job(st.session_state.get(session_key))
+        if job is None:
+            try:
+                job = self.route_jobs.submit(coords, beat=beat, **solver_options)
+            except RouteQueueFullError:
+                # Backpressure: nothing is queued for this session; it retries on the next poll.
+                self.pending = True
+                return RouteJob(None, status="busy")
+            st.session_state[session_key] = job.job_id
+        if not job.done:
+            self.pending = True
+        return job
+
+    def poll_pending(self):
+        # Called once the page is fully drawn: rerun shortly so pending routes
+        # are swapped in as soon as their jobs finish.
+        if self.pending:
+            time.sleep(self.POLL_INTERVAL)
+            st.rerun()
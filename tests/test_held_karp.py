@@ -0,0 +1,48 @@
+import itertools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo import distance_matrix_km  # noqa: E402
+from held_karp import held_karp_bound, held_karp_path  # noqa: E402
+from local_search import path_length  # noqa: E402
+
+
+def random_instance(n, seed):
+    rng = np.random.default_rng(seed)
+    coords = np.c_[14.4 + rng.random(n) * 0.2, 75.9 + rng.random(n) * 0.2]
+    return distance_matrix_km(coords)
+
+
+def brute_force_length(dist_matrix):
+    n = len(dist_matrix)
+    return min(path_length(np.array(route), dist_matrix) for route in itertools.permutations(range(n)))
+
+
+@pytest.mark.parametrize("n", range(3, 9))
+@pytest.mark.parametrize("seed", range(5))
+def test_held_karp_path_is_optimal(n, seed):
+    dist_matrix = random_instance(n, seed)
+    route = held_karp_path(dist_matrix)
+    assert sorted(route.tolist()) == list(range(n))
+    assert path_length(route, dist_matrix) == pytest.approx(brute_force_length(dist_matrix), abs=1e-9)
+
+
+@pytest.mark.parametrize("n", range(3, 9))
+@pytest.mark.parametrize("seed", range(5))
+def test_held_karp_bound_below_optimum(n, seed):
+    dist_matrix = random_instance(n, seed)
+    optimum = brute_force_length(dist_matrix)
+    for upper_bound in (optimum, 2 * optimum):
+        for iterations in (1, 100):
+            assert held_karp_bound(dist_matrix, upper_bound, iterations=iterations) <= optimum + 1e-9
+
+
+def test_held_karp_bound_never_below_mst():
+    dist_matrix = random_instance(8, 0)
+    mst = held_karp_bound(dist_matrix, brute_force_length(dist_matrix), iterations=1)
+    assert held_karp_bound(dist_matrix, brute_force_length(dist_matrix)) >= mst - 1e-9
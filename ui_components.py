@@ -71,9 +71,9 @@ class UIComponents:
         """, unsafe_allow_html=True)
 
     @staticmethod
-    def outlet_info_card(row):
+    def outlet_info_card(row, expanded=False):
         try:
-            with st.expander(f"🔹 {row['sequence']}. {row['outlet_name']}", expanded=False):
+            with st.expander(f"🔹 {row['sequence']}. {row['outlet_name']}", expanded=expanded):
                 st.markdown("#### Google Maps Link")
                 st.markdown(f"""
                 <div style="margin-bottom:20px;">
@@ -105,6 +105,81 @@ class UIComponents:
         except Exception as e:
             st.error(f"Error creating outlet card: {e}")
 
+    VISIT_PLAN_COLUMNS = ["sequence", "outlet_name", "type_name", "owner_name", "contact_no",
+                          "leg_distance_km", "cumulative_distance_km", "gmaps_link"]
+
+    @staticmethod
+    def visit_plan(sorted_df, key):
+        # One virtualized table for the whole beat; the full card is only
+        # rendered for the outlet the user selects.
+        try:
+            columns = [col for col in UIComponents.VISIT_PLAN_COLUMNS if col in sorted_df.columns]
+            event = st.dataframe(
+                sorted_df[columns],
+                hide_index=True,
+                use_container_width=True,
+                height=min(400, 35 * (len(sorted_df) + 1) + 3),
+                column_config={
+                    "sequence": st.column_config.NumberColumn("#", width="small"),
+                    "outlet_name": "Outlet",
+                    "type_name": "Type",
+                    "owner_name": "Owner",
+                    "contact_no": st.column_config.NumberColumn("Owner NO", format="%d"),
+                    "leg_distance_km": st.column_config.NumberColumn("Leg (km)", format="%.2f"),
+                    "cumulative_distance_km": st.column_config.NumberColumn("Total (km)", format="%.2f"),
+                    "gmaps_link": st.column_config.LinkColumn("Google Maps", display_text="Open"),
+                },
+                on_select="rerun",
+                selection_mode="single-row",
+                key=key,
+            )
+            selected = event.selection.rows
+            if selected:
+                UIComponents.outlet_info_card(sorted_df.iloc[selected[0]], expanded=True)
+            else:
+                st.caption("Select an outlet in the table to see its details.")
+        except Exception as e:
+            st.error(f"Error creating visit plan: {e}")
+
+    @staticmethod
+    def route_pending(beat, job, beat_df):
+        # Shown while the beat's route job runs: live status plus the outlets
+        # in their original order, replaced by the optimized plan once done.
+        if job.status == "busy":
+            status = "waiting for a free optimization slot"
+        elif job.status == "queued":
+            status = f"queued for {job.waited:.0f}s"
+        else:
+            status = f"running for {job.elapsed:.1f}s"
+            if job.best_distance is not None:
+                status += f" · best so far {job.best_distance:.2f} km"
+        st.info(f"⏳ Optimizing route for {beat}: {status}. The visit order will appear here when ready.")
+        st.progress(min(1.0, job.fraction))
+        columns = [col for col in ["outlet_name", "type_name", "owner_name", "contact_no"] if col in beat_df.columns]
+        st.dataframe(beat_df[columns], hide_index=True, use_container_width=True,
+                     height=min(400, 35 * (len(beat_df) + 1) + 3))
+
+    @staticmethod
+    def route_distance(total_distance, result, label="Total Route Distance"):
+        # The lower bound is a distance no route through these outlets can beat.
+        st.info(f"**{label}:** {total_distance:.2f} km · lower bound {result.lower_bound:.2f} km")
+
+    @staticmethod
+    def optimization_summary(result):
+        stop_reasons = {
+            "converged": "converged",
+            "stalled": "no further improvement",
+            "deadline": "time budget reached",
+            "iterations": "iteration budget reached",
+            "bound": "close to the lower bound",
+        }
+        quality = "optimal" if result.solver in ("held_karp", "trivial") else f"within {result.gap:.1%} of the lower bound"
+        st.caption(
+            f"Route solver: {result.solver} · {stop_reasons.get(result.stop_reason, result.stop_reason)} "
+            f"after {result.elapsed:.1f}s · {quality}"
+            + (" · served from route cache" if result.cached else "")
+        )
+
     @staticmethod
     def create_main_header():
         st.markdown("""